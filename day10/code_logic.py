@@ -2,7 +2,8 @@ import os.path
 from typing import List, Tuple
 
 import dotenv
-from utils.utils import get_input_if_not_exists, read_input_lines
+from utils.grid import Grid
+from utils.utils import get_input_if_not_exists
 
 dotenv.load_dotenv()
 
@@ -10,65 +11,51 @@ dotenv.load_dotenv()
 ## Implementation of PART 1
 
 
-def get_initial_positions(array: List[List[int]]) -> List[Tuple[int, int]]:
-    initial_positions = list()
-    for j, row in enumerate(array):
-        for i, char in enumerate(row):
-            if char != 0:
-                continue
-            initial_positions.append((i, j))
-    return initial_positions
-
-
-def recursive_climbing(position, array, valid_summits=list()):
-    current_value = array[position[1]][position[0]]
-    if current_value == 9:
-        valid_summits.append(position)
-        return valid_summits
-    next_steps = list()
-    for off_x, off_y in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-        new_x, new_y = [position[0] + off_x, position[1] + off_y]
-        if any([new_x < 0, new_y < 0, new_x >= len(array[0]), new_y >= len(array)]):
-            continue
-        if array[new_y][new_x] == current_value + 1:
-            next_steps.append((new_x, new_y))
-    if not next_steps:
-        return valid_summits
-    for new_x, new_y in next_steps:
-        recursive_climbing(
-            (new_x, new_y),
-            array,
-            valid_summits,
-        )
-
-    return valid_summits
+def compute_trails(grid: Grid) -> Tuple[List[int], List[int]]:
+    """Number of trails and set of reachable summits starting from every cell.
 
+    Heights are processed from 9 down to 0, each cell combining the values of
+    its neighbours one level higher, so every cell is visited once. Reachable
+    summits are stored as bitsets, one bit per summit.
+    """
+    nb_trails = [0] * (grid.width * grid.height)
+    reachable_summits = [0] * (grid.width * grid.height)
+    for summit_idx, (x, y) in enumerate(grid.find_all("9")):
+        nb_trails[y * grid.width + x] = 1
+        reachable_summits[y * grid.width + x] = 1 << summit_idx
 
-def solve_level1(filename: str):
-    lines = read_input_lines(filename)
-    array = [[int(char) for char in line] for line in lines]
-    initial_pos_list = get_initial_positions(array)
-    result = 0
-    for initial_pos in initial_pos_list:
+    for height in "876543210":
+        next_height = ord(height) + 1
+        for x, y in grid.find_all(height):
+            cell = y * grid.width + x
+            for new_x, new_y in grid.neighbours(x, y):
+                if grid[new_x, new_y] != next_height:
+                    continue
+                new_cell = new_y * grid.width + new_x
+                nb_trails[cell] += nb_trails[new_cell]
+                reachable_summits[cell] |= reachable_summits[new_cell]
+    return nb_trails, reachable_summits
 
-        result += len(set(recursive_climbing(initial_pos, array, [])))
 
-    return result
+def get_trailheads_cells(grid: Grid) -> List[int]:
+    return [y * grid.width + x for x, y in grid.find_all("0")]
 
 
-## Implementation of PART 2
+def solve_level1(filename: str):
+    with Grid.from_file(filename) as grid:
+        _, reachable_summits = compute_trails(grid)
+        trailheads_cells = get_trailheads_cells(grid)
+    return sum(reachable_summits[cell].bit_count() for cell in trailheads_cells)
 
 
-def solve_level2(filename: str):
-    lines = read_input_lines(filename)
-    array = [[int(char) for char in line] for line in lines]
-    initial_pos_list = get_initial_positions(array)
-    result = 0
-    for initial_pos in initial_pos_list:
+## Implementation of PART 2
 
-        result += len(recursive_climbing(initial_pos, array, []))
 
-    return result
+def solve_level2(filename: str):
+    with Grid.from_file(filename) as grid:
+        nb_trails, _ = compute_trails(grid)
+        trailheads_cells = get_trailheads_cells(grid)
+    return sum(nb_trails[cell] for cell in trailheads_cells)
 
 
 if __name__ == "__main__":
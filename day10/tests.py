@@ -1,5 +1,6 @@
 import os
-from code_logic import solve_level1, solve_level2
+from code_logic import compute_trails, solve_level1, solve_level2
+from utils.grid import Grid
 
 current_directory = os.path.dirname(__file__)
 
@@ -17,3 +18,12 @@ class TestAdventOfCode:
 
     def test_part2_input(self):
         assert solve_level2(f"{current_directory}/input2.txt") == 1192
+
+    def test_diagonal_slope(self):
+        lines = [
+            "".join(str(x + y) if x + y <= 9 else "." for x in range(10))
+            for y in range(10)
+        ]
+        nb_trails, reachable_summits = compute_trails(Grid.from_lines(lines))
+        assert nb_trails[0] == 2**9
+        assert reachable_summits[0].bit_count() == 10
@@ -1,10 +1,8 @@
-from collections import Counter, defaultdict
-from dataclasses import dataclass
-from itertools import chain
+from collections import Counter
+import json
 import os.path
-from typing import List, Tuple
+from typing import Dict, Tuple
 import dotenv
-from tqdm import tqdm
 
 from utils.utils import get_input_if_not_exists, read_input_lines
 
@@ -12,85 +10,76 @@ dotenv.load_dotenv()
 
 
 ## Implementation of PART 1
-@dataclass
-class MagicStone:
-    number: int
 
-    def _add_one(self):
-        return self.number + 1
+# Stones produced by one blink of a stone, shared by every run of the engine
+_blink_transitions: Dict[int, Tuple[int, ...]] = dict()
 
-    def _mult_2024(self):
-        return self.number * 2024
 
-    def _split_number(self):
-        str_number = str(self.number)
-        half_nb_digits = len(str_number) // 2
-        return list(
-            map(int, [str_number[:half_nb_digits], str_number[half_nb_digits:]])
-        )
+def count_digits(number: int) -> int:
+    nb_digits = 1
+    while number >= 10:
+        number //= 10
+        nb_digits += 1
+    return nb_digits
+
 
-    def blink(self):
-        if self.number == 0:
-            return [MagicStone(self._add_one())]
-        elif len(str(self.number)) % 2 == 0:
-            return [MagicStone(nb) for nb in self._split_number()]
+def blink_stone(number: int) -> Tuple[int, ...]:
+    transition = _blink_transitions.get(number)
+    if transition is not None:
+        return transition
+    if number == 0:
+        transition = (1,)
+    else:
+        nb_digits = count_digits(number)
+        if nb_digits % 2 == 0:
+            transition = divmod(number, 10 ** (nb_digits // 2))
         else:
-            return [MagicStone(self._mult_2024())]
+            transition = (number * 2024,)
+    _blink_transitions[number] = transition
+    return transition
+
+
+def blink_stones(stones_counter: Counter, nb_blinks: int) -> Counter:
+    # Stones with the same number evolve identically, so only the number of
+    # stones per distinct number is tracked
+    for _ in range(nb_blinks):
+        new_stones_counter = Counter()
+        for number, nb_stones in stones_counter.items():
+            for new_number in blink_stone(number):
+                new_stones_counter[new_number] += nb_stones
+        stones_counter = new_stones_counter
+    return stones_counter
+
+
+def save_blink_transitions(filename: str):
+    with open(filename, "w") as f:
+        json.dump({str(k): v for k, v in _blink_transitions.items()}, f)
+
+
+def load_blink_transitions(filename: str):
+    if not os.path.exists(filename):
+        return
+    with open(filename, "r") as f:
+        _blink_transitions.update(
+            {int(k): tuple(v) for k, v in json.load(f).items()}
+        )
 
 
-def recursive_stone_generator(magic_stone: MagicStone, nb_iter: int):
-    if nb_iter == 1:
-        yield magic_stone.blink()
-    else:
-        for stone in magic_stone.blink():
-            yield from recursive_stone_generator(stone, nb_iter - 1)
+def count_stones_after_blinks(filename: str, nb_blinks: int) -> int:
+    lines = read_input_lines(filename)[0]
+    stones_counter = Counter([int(str_nb) for str_nb in lines.split()])
+    return blink_stones(stones_counter, nb_blinks).total()
 
 
 def solve_level1(filename: str):
-    lines = read_input_lines(filename)[0]
-    nb_stones = 0
-    numbers_counter = Counter([int(str_nb) for str_nb in lines.split()])
-    for step in range(5):
-        stone_counter = Counter()
-        for iter_stone_nb, nb_stones in numbers_counter.items():
-            iter_stone_counter = Counter(
-                [
-                    stone.number
-                    for stone in chain.from_iterable(
-                        recursive_stone_generator(MagicStone(iter_stone_nb), 5)
-                    )
-                ]
-            )
-            mult_counter = {k: v * nb_stones for k, v in iter_stone_counter.items()}
-            stone_counter.update(mult_counter)
-        numbers_counter = stone_counter
-
-    return numbers_counter.total()
+    return count_stones_after_blinks(filename, 25)
 
 
 ## Implementation of PART 2
 
 
 def solve_level2(filename: str):
-    lines = read_input_lines(filename)[0]
-    nb_stones = 0
-    numbers_counter = Counter([int(str_nb) for str_nb in lines.split()])
-    for step in range(15):
-        stone_counter = Counter()
-        for iter_stone_nb, nb_stones in numbers_counter.items():
-            iter_stone_counter = Counter(
-                [
-                    stone.number
-                    for stone in chain.from_iterable(
-                        recursive_stone_generator(MagicStone(iter_stone_nb), 5)
-                    )
-                ]
-            )
-            mult_counter = {k: v * nb_stones for k, v in iter_stone_counter.items()}
-            stone_counter.update(mult_counter)
-        numbers_counter = stone_counter
-
-    return numbers_counter.total()
+    return count_stones_after_blinks(filename, 75)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,15 @@
+from collections import Counter
+import json
 import os
-from code_logic import solve_level1, solve_level2
+
+from code_logic import (
+    blink_stone,
+    blink_stones,
+    load_blink_transitions,
+    save_blink_transitions,
+    solve_level1,
+    solve_level2,
+)
 
 current_directory = os.path.dirname(__file__)
 
@@ -17,3 +27,24 @@ class TestAdventOfCode:
 
     def test_part2_input(self):
         assert solve_level2(f"{current_directory}/input2.txt") == 270673834779359
+
+    def test_blink_stones(self):
+        assert blink_stones(Counter([125, 17]), 6).total() == 22
+        assert blink_stones(Counter([125, 17]), 25).total() == 55312
+
+    def test_blink_transitions_persistence(self, tmp_path):
+        filename = tmp_path / "transitions.json"
+        blink_stones(Counter([125, 17]), 6)
+        save_blink_transitions(filename)
+        with open(filename) as f:
+            saved_transitions = json.load(f)
+        assert saved_transitions
+        assert all(
+            blink_stone(int(number)) == tuple(transition)
+            for number, transition in saved_transitions.items()
+        )
+        # Stones are never negative, so this transition can only come from the file
+        with open(filename, "w") as f:
+            json.dump({"-1": [7]}, f)
+        load_blink_transitions(filename)
+        assert blink_stone(-1) == (7,)
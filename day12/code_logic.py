@@ -1,10 +1,11 @@
-from itertools import chain, product
+from collections import deque
 import os.path
-from collections import Counter, defaultdict, deque
-from typing import Dict, List, Set, Tuple
+from typing import List, Optional, Tuple
 
 import dotenv
-from utils.utils import get_input_if_not_exists, read_input_lines
+import numpy as np
+from utils.grid import Grid
+from utils.utils import get_input_if_not_exists
 
 dotenv.load_dotenv()
 
@@ -12,127 +13,321 @@ dotenv.load_dotenv()
 ## Implementation of PART 1
 
 
-def assign_regions_to_array(array: List[List[str]]):
-    coords_to_region_label = {
-        coords: idx
-        for idx, coords in enumerate(product(range(len(array[0])), range(len(array))))
-    }
-    coords_to_letter = {
-        coords: array[coords[0]][coords[1]]
-        for coords in product(range(len(array[0])), range(len(array)))
-    }
-    offsets = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-    is_loop_unconverged = False
-    while not is_loop_unconverged:
-        is_loop_unconverged = True
-
-        for coords in coords_to_region_label.keys():
-            neighs = [(coords[0] + offs[0], coords[1] + offs[1]) for offs in offsets]
-            neighs_same_plot = [
-                neigh
-                for neigh in neighs
-                if coords_to_letter.get(neigh, "") == coords_to_letter[coords]
-            ]
-            group_labels = [
-                coords_to_region_label[xy] for xy in [coords] + neighs_same_plot
-            ]
-            if len(set(group_labels)) == 1:
-                continue
-            for xy in [coords] + neighs_same_plot:
-                coords_to_region_label[xy] = min(group_labels)
-            is_loop_unconverged = False
-    return coords_to_region_label
+class DisjointSet:
+    def __init__(self, size: int):
+        self.parents = list(range(size))
+        self.sizes = [1] * size
+
+    def find(self, item: int) -> int:
+        parents = self.parents
+        while parents[item] != item:
+            parents[item] = parents[parents[item]]
+            item = parents[item]
+        return item
+
+    def union(self, item1: int, item2: int):
+        root1, root2 = self.find(item1), self.find(item2)
+        if root1 == root2:
+            return
+        if self.sizes[root1] < self.sizes[root2]:
+            root1, root2 = root2, root1
+        self.parents[root2] = root1
+        self.sizes[root1] += self.sizes[root2]
+
+
+def assign_regions_to_array(grid: Grid) -> Tuple[List[int], int]:
+    """Label every plot with the id of its region, from 0 to the number of regions.
+
+    Labels are stored in a flat list indexed by `y * width + x`.
+    """
+    width, height = grid.width, grid.height
+    disjoint_set = DisjointSet(width * height)
+    for y in range(height):
+        row = grid.row(y)
+        next_row = grid.row(y + 1) if y + 1 < height else None
+        for x in range(width):
+            cell = y * width + x
+            if x + 1 < width and row[x + 1] == row[x]:
+                disjoint_set.union(cell, cell + 1)
+            if next_row is not None and next_row[x] == row[x]:
+                disjoint_set.union(cell, cell + width)
+
+    roots_to_labels = dict()
+    labels = [0] * (width * height)
+    for cell in range(width * height):
+        root = disjoint_set.find(cell)
+        labels[cell] = roots_to_labels.setdefault(root, len(roots_to_labels))
+    return labels, len(roots_to_labels)
+
+
+def compute_regions_measures(
+    labels: List[int], width: int, height: int, nb_regions: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Area, perimeter and number of sides (as many as corners) of every region,
+    from a 2x2 window sliding over the label grid padded with -1.
+    """
+    padded = np.full((height + 2, width + 2), -1, dtype=np.int64)
+    padded[1:-1, 1:-1] = np.asarray(labels, dtype=np.int64).reshape(height, width)
+    top_left, top_right = padded[:-1, :-1], padded[:-1, 1:]
+    bottom_left, bottom_right = padded[1:, :-1], padded[1:, 1:]
+
+    def _count_per_region(cells_labels: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        mask = mask & (cells_labels >= 0)
+        return np.bincount(cells_labels[mask], minlength=nb_regions)
+
+    areas = np.bincount(np.asarray(labels, dtype=np.int64), minlength=nb_regions)
+
+    # The top and left sides of the windows hold every pair of adjacent cells
+    horizontal_fences = top_left != top_right
+    vertical_fences = top_left != bottom_left
+    perimeters = (
+        _count_per_region(top_left, horizontal_fences)
+        + _count_per_region(top_right, horizontal_fences)
+        + _count_per_region(top_left, vertical_fences)
+        + _count_per_region(bottom_left, vertical_fences)
+    )
 
+    # A cell makes a corner at the window center when it differs from both its
+    # neighbours in the window, or matches both but not the diagonal one
+    corners = np.zeros(nb_regions, dtype=np.int64)
+    for cell, horizontal, vertical, diagonal in [
+        (top_left, top_right, bottom_left, bottom_right),
+        (top_right, top_left, bottom_right, bottom_left),
+        (bottom_left, bottom_right, top_left, top_right),
+        (bottom_right, bottom_left, top_right, top_left),
+    ]:
+        same_horizontal, same_vertical = cell == horizontal, cell == vertical
+        is_corner = (~same_horizontal & ~same_vertical) | (
+            same_horizontal & same_vertical & (cell != diagonal)
+        )
+        corners += _count_per_region(cell, is_corner)
 
-def inverse_coords_to_region(
-    coords_to_region: Dict[Tuple[int, int], int]
-) -> Dict[int, Set[Tuple[int, int]]]:
-    region_to_coords = defaultdict(set)
-    for coord, region in coords_to_region.items():
-        region_to_coords[region].add(coord)
-    return region_to_coords
+    return areas, perimeters, corners
 
 
-def get_region_area(coords_set: Set[Tuple[int, int]]) -> int:
-    return len(coords_set)
+def get_regions_measures(
+    filename: str,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    with Grid.from_file(filename) as grid:
+        labels, nb_regions = assign_regions_to_array(grid)
+    return compute_regions_measures(labels, grid.width, grid.height, nb_regions)
 
 
-def get_regions_perimeter(coords_set: Set[Tuple[int, int]]) -> int:
-    adjacent_positions = get_adjacent_positions_counter(coords_set)
-    return sum(
-        [
-            count
-            for coords, count in adjacent_positions.items()
-            if coords not in coords_set
-        ]
-    )
+def solve_level1(filename: str):
+    areas, perimeters, _ = get_regions_measures(filename)
+    return int(areas @ perimeters)
 
 
-def get_adjacent_positions_counter(coords_set):
-    adjacent_positions = Counter()
-    for coords in coords_set:
-        adjacent_positions.update(
-            (coords[0] + offset[0], coords[1] + offset[1])
-            for offset in [(0, 1), (0, -1), (1, 0), (-1, 0)]
-        )
+## Implementation of PART 2
 
-    return adjacent_positions
 
+def solve_level2(filename: str):
+    areas, _, corners = get_regions_measures(filename)
+    return int(areas @ corners)
 
-def get_array(lines: List[str]) -> List[List[str]]:
-    array = []
-    for line in lines:
-        array.append(list(line))
-    return array
 
+## Incremental edits of the garden
 
-def solve_level1(filename: str):
-    lines = read_input_lines(filename)
-    array = get_array(lines)
-    coords_to_region = assign_regions_to_array(array)
-    region_to_coords = inverse_coords_to_region(coords_to_region)
-    price = 0
-    for region, coords in region_to_coords.items():
-        price += get_region_area(coords) * get_regions_perimeter(coords)
 
-    return price
+class Garden:
+    """Garden keeping region measures up to date as plots change, only
+    recomputing the 3x3 neighbourhood of each edited plot.
+    """
+
+    def __init__(self, grid: Grid):
+        self.width, self.height = grid.width, grid.height
+        self.letters = bytearray(b"".join(grid.row(y) for y in range(grid.height)))
+        self.labels, nb_regions = assign_regions_to_array(grid)
+        areas, perimeters, corners = compute_regions_measures(
+            self.labels, self.width, self.height, nb_regions
+        )
+        self.regions = {
+            label: [int(area), int(perimeter), int(nb_corners)]
+            for label, (area, perimeter, nb_corners) in enumerate(
+                zip(areas, perimeters, corners)
+            )
+        }
+        self.next_label = nb_regions
+        self.fence_price = int(areas @ perimeters)
+        self.sides_price = int(areas @ corners)
+
+    @classmethod
+    def from_file(cls, filename: str):
+        with Grid.from_file(filename) as grid:
+            return cls(grid)
+
+    def _is_letter(self, x: int, y: int, letter: int) -> bool:
+        return (
+            0 <= x < self.width
+            and 0 <= y < self.height
+            and self.letters[y * self.width + x] == letter
+        )
 
+    def _adjacent_cells(self, cell: int) -> List[int]:
+        x, y = cell % self.width, cell // self.width
+        return [
+            (y + dy) * self.width + x + dx
+            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]
+            if 0 <= x + dx < self.width and 0 <= y + dy < self.height
+        ]
 
-## Implementation of PART 2
+    def _neighbourhood_cells(self, cell: int) -> List[int]:
+        x, y = cell % self.width, cell // self.width
+        return [
+            new_y * self.width + new_x
+            for new_x in range(max(0, x - 1), min(self.width, x + 2))
+            for new_y in range(max(0, y - 1), min(self.height, y + 2))
+        ]
 
+    def _cell_measures(self, cell: int) -> Tuple[int, int]:
+        x, y = cell % self.width, cell // self.width
+        letter = self.letters[cell]
+        perimeter = sum(
+            not self._is_letter(x + dx, y + dy, letter)
+            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        )
+        corners = 0
+        for dx, dy in [(1, 1), (1, -1), (-1, 1), (-1, -1)]:
+            horizontal = self._is_letter(x + dx, y, letter)
+            vertical = self._is_letter(x, y + dy, letter)
+            if not horizontal and not vertical:
+                corners += 1
+            elif (
+                horizontal
+                and vertical
+                and not self._is_letter(x + dx, y + dy, letter)
+            ):
+                corners += 1
+        return perimeter, corners
+
+    def _set_region(self, label: int, measures: List[int]):
+        old_area, old_perimeter, old_corners = self.regions.pop(label, [0, 0, 0])
+        self.fence_price -= old_area * old_perimeter
+        self.sides_price -= old_area * old_corners
+        if measures[0] == 0:
+            return
+        self.regions[label] = measures
+        self.fence_price += measures[0] * measures[1]
+        self.sides_price += measures[0] * measures[2]
+
+    def _update_region(self, label: int, area: int, perimeter: int, corners: int):
+        old_area, old_perimeter, old_corners = self.regions.get(label, [0, 0, 0])
+        self._set_region(
+            label, [old_area + area, old_perimeter + perimeter, old_corners + corners]
+        )
 
-def count_number_of_corners(coords_set: Set[Tuple[int, int]]) -> int:
-    corners_count = 0
-    for x, y in coords_set:
-        vertical_offsets, horizontal_offsets = [(1, 0), (-1, 0)], [(0, 1), (0, -1)]
-        for offset_pair in product(vertical_offsets, horizontal_offsets):
-            neighs_in_set = sum(
-                [
-                    int((x + offset[0], y + offset[1]) in coords_set)
-                    for offset in offset_pair
-                ]
-            )
-            if neighs_in_set == 0:
-                corners_count += 1
-            diagonal_coords = (
-                x + offset_pair[0][0] + offset_pair[1][0],
-                y + offset_pair[0][1] + offset_pair[1][1],
+    def _walk_region(
+        self, start_cell: int, new_label: Optional[int] = None
+    ) -> List[int]:
+        label = self.labels[start_cell]
+        if new_label is not None:
+            self.labels[start_cell] = new_label
+        region_cells, visited, queue = [start_cell], {start_cell}, deque([start_cell])
+        while queue:
+            cell = queue.popleft()
+            for adjacent_cell in self._adjacent_cells(cell):
+                if adjacent_cell in visited or self.labels[adjacent_cell] != label:
+                    continue
+                visited.add(adjacent_cell)
+                if new_label is not None:
+                    self.labels[adjacent_cell] = new_label
+                region_cells.append(adjacent_cell)
+                queue.append(adjacent_cell)
+        return region_cells
+
+    def _split_region(self, cell: int, label: int) -> List[Tuple[int, List[int]]]:
+        remaining_starts = [
+            adjacent_cell
+            for adjacent_cell in self._adjacent_cells(cell)
+            if self.labels[adjacent_cell] == label
+        ]
+        if len(remaining_starts) <= 1:
+            return []
+        components = list()
+        while remaining_starts:
+            start_cell = remaining_starts.pop()
+            if components:
+                new_label = self.next_label
+                self.next_label += 1
+                region_cells = self._walk_region(start_cell, new_label)
+            else:
+                new_label = label
+                region_cells = self._walk_region(start_cell)
+            region_cells_set = set(region_cells)
+            remaining_starts = [
+                start for start in remaining_starts if start not in region_cells_set
+            ]
+            components.append((new_label, region_cells))
+        return components if len(components) > 1 else []
+
+    def _merge_regions_around(self, cell: int) -> int:
+        letter = self.letters[cell]
+        adjacent_labels = {
+            self.labels[adjacent_cell]: adjacent_cell
+            for adjacent_cell in self._adjacent_cells(cell)
+            if self.letters[adjacent_cell] == letter
+        }
+        if not adjacent_labels:
+            self.next_label += 1
+            return self.next_label - 1
+        # The largest region absorbs the others, so only the smaller ones are relabelled
+        kept_label = max(adjacent_labels, key=lambda label: self.regions[label][0])
+        for label, adjacent_cell in adjacent_labels.items():
+            if label == kept_label:
+                continue
+            self._walk_region(adjacent_cell, kept_label)
+            self._update_region(kept_label, *self.regions[label])
+            self._set_region(label, [0, 0, 0])
+        return kept_label
+
+    def set_plot(self, x: int, y: int, letter: str):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"Coordinates {(x, y)} out of the garden")
+        cell = y * self.width + x
+        new_letter = ord(letter)
+        if self.letters[cell] == new_letter:
+            return
+
+        neighbourhood_cells = self._neighbourhood_cells(cell)
+        for neighbour_cell in neighbourhood_cells:
+            perimeter, corners = self._cell_measures(neighbour_cell)
+            self._update_region(
+                self.labels[neighbour_cell],
+                -int(neighbour_cell == cell),
+                -perimeter,
+                -corners,
             )
-            if neighs_in_set == 2 and diagonal_coords not in coords_set:
-                corners_count += 1
-    return corners_count
 
+        old_label = self.labels[cell]
+        self.letters[cell] = new_letter
+        self.labels[cell] = -1
+        split_components = self._split_region(cell, old_label)
+        self.labels[cell] = self._merge_regions_around(cell)
+
+        for neighbour_cell in neighbourhood_cells:
+            perimeter, corners = self._cell_measures(neighbour_cell)
+            self._update_region(
+                self.labels[neighbour_cell],
+                int(neighbour_cell == cell),
+                perimeter,
+                corners,
+            )
 
-def solve_level2(filename: str):
-    lines = read_input_lines(filename)
-    array = get_array(lines)
-    coords_to_region = assign_regions_to_array(array)
-    region_to_coords = inverse_coords_to_region(coords_to_region)
-    price = 0
-    for coords in region_to_coords.values():
-        price += get_region_area(coords) * count_number_of_corners(coords)
-
-    return price
+        # Split parts share the values the old region accumulated, so they are
+        # measured again from their own plots
+        for label, region_cells in split_components:
+            measures = [len(region_cells), 0, 0]
+            for region_cell in region_cells:
+                perimeter, corners = self._cell_measures(region_cell)
+                measures[1] += perimeter
+                measures[2] += corners
+            self._set_region(label, measures)
+
+    def get_lines(self) -> List[str]:
+        return [
+            self.letters[y * self.width : (y + 1) * self.width].decode("ascii")
+            for y in range(self.height)
+        ]
 
 
 if __name__ == "__main__":
@@ -1,6 +1,15 @@
 import os
 
-from code_logic import solve_level1, solve_level2
+import pytest
+
+from code_logic import (
+    Garden,
+    assign_regions_to_array,
+    compute_regions_measures,
+    solve_level1,
+    solve_level2,
+)
+from utils.grid import Grid
 
 current_directory = os.path.dirname(__file__)
 
@@ -18,3 +27,46 @@ class TestAdventOfCode:
 
     def test_part2_input(self):
         assert solve_level2(f"{current_directory}/input2.txt") == 904114
+
+    def test_regions_measures(self):
+        grid = Grid.from_lines(["AAAA", "BBCD", "BBCC", "EEEC"])
+        labels, nb_regions = assign_regions_to_array(grid)
+        assert nb_regions == 5
+        areas, perimeters, corners = compute_regions_measures(labels, 4, 4, nb_regions)
+        assert areas.tolist() == [4, 4, 4, 1, 3]
+        assert perimeters.tolist() == [10, 8, 10, 4, 8]
+        assert corners.tolist() == [4, 4, 8, 4, 4]
+
+    def test_regions_touching_diagonally(self):
+        lines = ["AAAAAA", "AAABBA", "AAABBA", "ABBAAA", "ABBAAA", "AAAAAA"]
+        labels, nb_regions = assign_regions_to_array(Grid.from_lines(lines))
+        areas, _, corners = compute_regions_measures(labels, 6, 6, nb_regions)
+        assert int(areas @ corners) == 368
+
+    def test_garden_edits(self):
+        garden = Garden.from_file(f"{current_directory}/sample1.txt")
+        assert garden.fence_price == 1930
+        assert garden.sides_price == 1206
+        # Cut the top of the R region off, merge it back, then grow it
+        for x, y, letter in [
+            (0, 1, "X"),
+            (1, 1, "X"),
+            (2, 1, "X"),
+            (3, 1, "X"),
+            (3, 1, "R"),
+            (4, 0, "R"),
+            (6, 6, "Z"),
+        ]:
+            garden.set_plot(x, y, letter)
+            fresh_garden = Garden(Grid.from_lines(garden.get_lines()))
+            assert garden.fence_price == fresh_garden.fence_price
+            assert garden.sides_price == fresh_garden.sides_price
+
+    def test_garden_edits_out_of_bounds(self):
+        lines = ["AAB", "ABB", "CCC"]
+        garden = Garden(Grid.from_lines(lines))
+        for x, y in [(-1, 0), (3, 0), (0, -1), (0, 3)]:
+            with pytest.raises(IndexError):
+                garden.set_plot(x, y, "Z")
+        assert garden.get_lines() == lines
+        assert garden.fence_price == Garden(Grid.from_lines(lines)).fence_price
@@ -1,8 +1,9 @@
 import os.path
 import re
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import dotenv
+import numpy as np
 from utils.utils import get_input_if_not_exists, read_input_lines
 
 dotenv.load_dotenv()
@@ -10,13 +11,8 @@ dotenv.load_dotenv()
 
 ## Implementation of PART 1
 
-
-def solve_equation_system(prize_X, prize_Y, coef_X_A, coef_Y_A, coef_X_B, coef_Y_B):
-    # prize_X = coef_X_A * a + coef_X_B * b
-    # prize_Y = coef_Y_A * a + coef_Y_B * b
-    b = (prize_Y * coef_X_A - prize_X * coef_Y_A) / (coef_X_A * coef_Y_B - coef_Y_A * coef_X_B)
-    a = (prize_X - coef_X_B * b) / coef_X_A
-    return a, b
+# Largest magnitude for which the products of Cramer's rule fit in int64
+INT64_SAFE_MAGNITUDE = 2**31
 
 
 def extract_equation_input(line: List[str], increase_prize_dists: bool = False):
@@ -34,26 +30,122 @@ def extract_equation_input(line: List[str], increase_prize_dists: bool = False):
     )
 
 
-def get_tokes(A_times, B_times):
-    return int(A_times * 3 + B_times)
-
-
-def solve_level1(filename: str):
-    lines = read_input_lines(filename)
-    eqs: List[List[str]] = [lines[idx : idx + 3] for idx in range(0, len(lines), 4)]
-    result = 0
-
-    for eq in eqs:
+def get_machines_array(
+    lines: List[str], increase_prize_dists: bool = False
+) -> np.ndarray:
+    """One row per machine: prize_X, prize_Y, coef_X_A, coef_Y_A, coef_X_B, coef_Y_B."""
+    machines = [
+        extract_equation_input(lines[idx : idx + 3], increase_prize_dists)
+        for idx in range(0, len(lines), 4)
+    ]
+    max_prize = max((max(machine[:2]) for machine in machines), default=0)
+    max_coef = max((max(machine[2:]) for machine in machines), default=0)
+    # Every product of Cramer's rule is a prize times a coefficient or two
+    # coefficients: fall back to exact Python integers when int64 could overflow
+    if max(max_prize, max_coef) * max_coef < INT64_SAFE_MAGNITUDE**2:
+        return np.array(machines, dtype=np.int64).reshape(-1, 6)
+    return np.array(machines, dtype=object).reshape(-1, 6)
+
+
+def extended_gcd(a: int, b: int) -> Tuple[int, int, int]:
+    """gcd(a, b) along with x and y such that a * x + b * y = gcd(a, b)."""
+    old_r, r, old_x, x, old_y, y = a, b, 1, 0, 0, 1
+    while r != 0:
+        quotient = old_r // r
+        old_r, r = r, old_r - quotient * r
+        old_x, x = x, old_x - quotient * x
+        old_y, y = y, old_y - quotient * y
+    return old_r, old_x, old_y
+
+
+def solve_linear_diophantine(
+    coef_A: int, coef_B: int, prize: int
+) -> Optional[Tuple[int, int]]:
+    """Cheapest non-negative (a, b) with coef_A * a + coef_B * b = prize, A costing 3."""
+    if coef_A == 0 and coef_B == 0:
+        return (0, 0) if prize == 0 else None
+    if coef_A == 0 or coef_B == 0:
+        coef = coef_A or coef_B
+        if prize % coef != 0 or prize // coef < 0:
+            return None
+        return (prize // coef, 0) if coef_A else (0, prize // coef)
+
+    divisor, x0, y0 = extended_gcd(coef_A, coef_B)
+    if prize % divisor != 0:
+        return None
+    # Every solution is (a0 + k * step_a, b0 - k * step_b), and its cost is linear
+    # in k, so the cheapest one sits at one end of the range of valid k
+    a0, b0 = x0 * (prize // divisor), y0 * (prize // divisor)
+    step_a, step_b = coef_B // divisor, coef_A // divisor
+    min_k = -(a0 // step_a)
+    max_k = b0 // step_b
+    if min_k > max_k:
+        return None
+    k = min_k if 3 * step_a - step_b > 0 else max_k
+    return a0 + k * step_a, b0 - k * step_b
+
+
+def solve_singular_equation_system(
+    prize_X, prize_Y, coef_X_A, coef_Y_A, coef_X_B, coef_Y_B
+) -> Optional[Tuple[int, int]]:
+    # With collinear buttons, the prize can only be reached if it lies on the
+    # same line, in which case one coordinate is enough to describe the moves
+    if (
+        coef_X_A * prize_Y - coef_Y_A * prize_X != 0
+        or coef_X_B * prize_Y - coef_Y_B * prize_X != 0
+    ):
+        return None
+    if coef_X_A == 0 and coef_X_B == 0:
+        if coef_Y_A == 0 and coef_Y_B == 0 and prize_X != 0:
+            return None
+        return solve_linear_diophantine(coef_Y_A, coef_Y_B, prize_Y)
+    return solve_linear_diophantine(coef_X_A, coef_X_B, prize_X)
+
+
+def solve_equation_systems(
+    machines: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Number of A and B presses for every machine, and whether it is solvable.
+
+    prize_X = coef_X_A * a + coef_X_B * b
+    prize_Y = coef_Y_A * a + coef_Y_B * b
+    is solved with Cramer's rule, keeping only exact non-negative integer solutions.
+    Machines with collinear buttons are solved one by one as 1D problems.
+    """
+    prize_X, prize_Y, coef_X_A, coef_Y_A, coef_X_B, coef_Y_B = machines.T
+    determinant = coef_X_A * coef_Y_B - coef_Y_A * coef_X_B
+    a_numerator = prize_X * coef_Y_B - prize_Y * coef_X_B
+    b_numerator = coef_X_A * prize_Y - coef_Y_A * prize_X
+
+    is_regular = determinant != 0
+    safe_determinant = np.where(is_regular, determinant, 1)
+    A_times = a_numerator // safe_determinant
+    B_times = b_numerator // safe_determinant
+    is_solvable = (
+        is_regular
+        & (a_numerator % safe_determinant == 0)
+        & (b_numerator % safe_determinant == 0)
+        & (A_times >= 0)
+        & (B_times >= 0)
+    )
+    for idx in np.flatnonzero(~is_regular):
+        solution = solve_singular_equation_system(*machines[idx])
+        if solution is not None:
+            A_times[idx], B_times[idx] = solution
+            is_solvable[idx] = True
+    return A_times, B_times, is_solvable
 
-        args = extract_equation_input(eq)
-        A_times, B_times = solve_equation_system(*args)
 
-        if not A_times.is_integer() or not B_times.is_integer():
-            continue
+def count_tokens(machines: np.ndarray) -> int:
+    A_times, B_times, is_solvable = solve_equation_systems(machines)
+    # The int64 guard only covers the products of Cramer's rule, so the tokens
+    # are added up as exact Python integers
+    return 3 * sum(A_times[is_solvable].tolist()) + sum(B_times[is_solvable].tolist())
 
-        result += get_tokes(A_times, B_times)
 
-    return result
+def solve_level1(filename: str):
+    lines = read_input_lines(filename)
+    return count_tokens(get_machines_array(lines))
 
 
 ## Implementation of PART 2
@@ -61,22 +153,7 @@ def solve_level1(filename: str):
 
 def solve_level2(filename: str):
     lines = read_input_lines(filename)
-    eqs: List[List[str]] = [lines[idx : idx + 3] for idx in range(0, len(lines), 4)]
-    result = 0
-    for eq in eqs:
-        args = extract_equation_input(eq, increase_prize_dists=True)
-        A_times, B_times = solve_equation_system(*args)
-        if any(
-            [
-                not A_times.is_integer(),
-                not B_times.is_integer(),
-            ]
-        ):
-            continue
-
-        result += get_tokes(A_times, B_times)
-
-    return result
+    return count_tokens(get_machines_array(lines, increase_prize_dists=True))
 
 
 if __name__ == "__main__":
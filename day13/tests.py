@@ -1,6 +1,7 @@
 import os
 
-from code_logic import solve_level1, solve_level2
+import numpy as np
+from code_logic import count_tokens, solve_level1, solve_level2
 
 current_directory = os.path.dirname(__file__)
 
@@ -15,3 +16,28 @@ class TestAdventOfCode:
 
     def test_part2_input(self):
         assert solve_level2(f"{current_directory}/input1.txt") == 90798500745591
+
+    def test_exact_integers_beyond_int64(self):
+        offset = 10**30
+        machines = np.array(
+            [
+                [94 * offset + 22, 34 * offset + 67, 94, 34, 22, 67],
+                [94 * offset + 23, 34 * offset + 67, 94, 34, 22, 67],
+            ],
+            dtype=object,
+        )
+        assert count_tokens(machines) == 3 * offset + 1
+
+    def test_collinear_buttons(self):
+        machines = np.array(
+            [[10, 10, 2, 2, 4, 4], [11, 11, 2, 2, 4, 4], [9, 6, 3, 2, 6, 4]]
+        )
+        assert count_tokens(machines) == 5 + 4
+
+    def test_token_sum_beyond_int64(self):
+        nb_machines, offset = 300_000, 10_000_000_000_000
+        prizes = np.arange(nb_machines, dtype=np.int64) + offset
+        machines = np.zeros((nb_machines, 6), dtype=np.int64)
+        machines[:, 0] = machines[:, 1] = prizes
+        machines[:, 2] = machines[:, 5] = 1
+        assert count_tokens(machines) == 4 * sum(range(offset, offset + nb_machines))
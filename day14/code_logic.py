@@ -1,11 +1,10 @@
-from collections import Counter
 from dataclasses import dataclass
-from math import prod
+import math
 import os.path
 import re
-from typing import List, Tuple
+from typing import Tuple
 import dotenv
-from tqdm import tqdm
+import numpy as np
 
 from utils.utils import get_input_if_not_exists, read_input_lines
 
@@ -27,109 +26,77 @@ class Grid:
         self.mid_x = self.max_x // 2
         self.mid_y = self.max_y // 2
 
-    def assign_quadrant(self, x, y):
-        if x == self.mid_x or y == self.mid_y:
-            return None
-        return int(x > self.mid_x) + 2 * int(y > self.mid_y)
+    def count_robots_per_quadrant(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        in_quadrant = (xs != self.mid_x) & (ys != self.mid_y)
+        quadrants = (xs > self.mid_x).astype(np.int64) + 2 * (ys > self.mid_y)
+        return np.bincount(quadrants[in_quadrant], minlength=4)
 
 
-@dataclass
-class Robot:
-    x: int
-    y: int
-    dx: int
-    dy: int
-    grid: Grid
-
-    def _move_one_step(self):
-        self.x += self.dx
-        self.y += self.dy
+def parse_line(string: str):
+    integers = list(map(int, re.findall(r"-?\d+", string)))
+    return integers
 
-    def _teleport_if_out_of_grid(self):
-        if self.x < 0:
-            self.x += self.grid.max_x
 
-        if self.y < 0:
-            self.y += self.grid.max_y
+def get_robots_array(filename: str) -> np.ndarray:
+    """One row per robot: x, y, dx, dy."""
+    parsed_lines = [parse_line(line) for line in read_input_lines(filename)]
+    return np.array(parsed_lines, dtype=np.int64).reshape(-1, 4)
 
-        if self.x >= self.grid.max_x:
-            self.x %= self.grid.max_x
 
-        if self.y >= self.grid.max_y:
-            self.y %= self.grid.max_y
+def get_positions_after_n_steps(
+    robots: np.ndarray, n: int, grid: Grid
+) -> Tuple[np.ndarray, np.ndarray]:
+    # Positions are periodic, so the number of steps is reduced modulo the grid
+    # dimensions first and the products stay small whatever n is
+    xs = (robots[:, 0] + robots[:, 2] * (n % grid.max_x)) % grid.max_x
+    ys = (robots[:, 1] + robots[:, 3] * (n % grid.max_y)) % grid.max_y
+    return xs, ys
 
-    def move_n_steps(self, n):
-        for _ in range(n):
-            self._move_one_step()
-            self._teleport_if_out_of_grid()
 
-    def _get_quadrant(self):
-        return self.grid.assign_quadrant(self.x, self.y)
+def get_safety_factor(robots: np.ndarray, nb_steps: int, grid: Grid) -> int:
+    xs, ys = get_positions_after_n_steps(robots, nb_steps, grid)
+    quadrants_counts = grid.count_robots_per_quadrant(xs, ys)
+    # The product of the counts can overflow int64, so it uses Python integers
+    return math.prod(int(count) for count in quadrants_counts if count)
 
 
-def parse_line(string: str):
-    integers = list(map(int, re.findall(r"-?\d+", string)))
-    return integers
-
-
-def solve_level1(filename: str, grid_max_x, grid_max_y):
-    parsed_lines = [parse_line(line) for line in read_input_lines(filename)]
+def solve_level1(filename: str, grid_max_x, grid_max_y, nb_steps: int = 100):
+    robots = get_robots_array(filename)
     grid = Grid(grid_max_x, grid_max_y)
-    robots_list = [Robot(*integers, grid) for integers in parsed_lines]
-    for robot in robots_list:
-        robot.move_n_steps(100)
-
-    quadrants = [robot._get_quadrant() for robot in robots_list]
-    quadrants_counter = Counter([quad for quad in quadrants if isinstance(quad, int)])
-    safety_factor = prod(quadrants_counter.values())
-    return safety_factor
+    return get_safety_factor(robots, nb_steps, grid)
 
 
 ## Implementation of PART 2
 
 
-def print_grid(robots_list: List[Robot], grid: Grid):
-    grid_matrix = [["." for _ in range(grid.max_x)] for _ in range(grid.max_y)]
-    for robot in robots_list:
-        grid_matrix[robot.y][robot.x] = "X"
-
-    for row in grid_matrix:
-        print("".join(row))
+def get_min_variance_step(
+    positions: np.ndarray, speeds: np.ndarray, period: int
+) -> int:
+    # Along one axis, positions repeat every `period` steps: the picture shows up
+    # as the step where robots are the most packed together on that axis
+    variances = [
+        np.var((positions + speeds * step) % period) for step in range(period)
+    ]
+    return int(np.argmin(variances))
 
 
-def is_potential_tree_trunk(robots_list: List[Robot], min_detected_lines: int):
-    # Check for vertical lines !
-    detected_lines = 0
-    robot_positions_set = {(robot.x, robot.y) for robot in robots_list}
-    for idx, robot in enumerate(robots_list):
-        for vertical_offset in range(1, 6, 1):
-            if not (robot.x, robot.y + vertical_offset) in robot_positions_set:
-                break
-            if vertical_offset == 5:
-                detected_lines += 1
-                print(idx, robot)
-        if detected_lines >= min_detected_lines:
-            return True
-    return False
+def chinese_remainder(
+    remainder1: int, modulus1: int, remainder2: int, modulus2: int
+) -> int:
+    """Smallest t >= 0 equal to remainder1 mod modulus1 and remainder2 mod modulus2."""
+    if math.gcd(modulus1, modulus2) != 1:
+        raise ValueError("Moduli should be coprime")
+    inverse = pow(modulus1, -1, modulus2)
+    k = ((remainder2 - remainder1) * inverse) % modulus2
+    return remainder1 + k * modulus1
 
 
 def solve_level2(filename: str, grid_max_x, grid_max_y):
-    parsed_lines = [parse_line(line) for line in read_input_lines(filename)]
+    robots = get_robots_array(filename)
     grid = Grid(grid_max_x, grid_max_y)
-    robots_list = [Robot(*integers, grid) for integers in parsed_lines]
-    for step in tqdm(range(10_000)):
-        for robot in robots_list:
-            robot.move_n_steps(1)
-        if is_potential_tree_trunk(robots_list, 2):
-            print(step, "\n")
-            print_grid(robots_list, grid)
-            print("\n")
-            # Found after 6242 steps !!
-
-    quadrants = [robot._get_quadrant() for robot in robots_list]
-    quadrants_counter = Counter([quad for quad in quadrants if isinstance(quad, int)])
-    safety_factor = prod(quadrants_counter.values())
-    return safety_factor
+    step_x = get_min_variance_step(robots[:, 0], robots[:, 2], grid.max_x)
+    step_y = get_min_variance_step(robots[:, 1], robots[:, 3], grid.max_y)
+    return chinese_remainder(step_x, grid.max_x, step_y, grid.max_y)
 
 
 if __name__ == "__main__":
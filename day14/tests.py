@@ -1,5 +1,7 @@
 import os
-from code_logic import solve_level1, solve_level2
+
+import numpy as np
+from code_logic import Grid, get_safety_factor, solve_level1, solve_level2
 
 current_directory = os.path.dirname(__file__)
 
@@ -12,5 +14,33 @@ class TestAdventOfCode:
     def test_part1_input(self):
         assert solve_level1(f"{current_directory}/input1.txt", 101, 103) == 222901875
 
-    # No tests for part two, just looking at nice pictures from time to time
-    # Anyway, answer was 6242 (so 6243 seconds) for this input file
+    def test_part1_sample_periodic_steps(self):
+        # Robots are back to the same positions every 11 * 7 steps
+        nb_steps = 100 + 77 * 10**9
+        assert solve_level1(f"{current_directory}/sample1.txt", 11, 7, nb_steps) == 12
+
+    def test_part2_input(self):
+        assert solve_level2(f"{current_directory}/input2.txt", 101, 103) == 6243
+
+    def test_safety_factor_beyond_int64(self):
+        # 100k, 200k, 300k and 400k robots in the four quadrants, with speeds
+        # bringing them back to their start position at every step
+        random_generator = np.random.default_rng(14)
+        quadrants_starts = [(0, 0), (51, 0), (0, 52), (51, 52)]
+        robots = np.concatenate(
+            [
+                np.column_stack(
+                    [
+                        random_generator.integers(x, x + 50, nb_robots),
+                        random_generator.integers(y, y + 51, nb_robots),
+                        101 * random_generator.integers(-5, 6, nb_robots),
+                        103 * random_generator.integers(-5, 6, nb_robots),
+                    ]
+                )
+                for nb_robots, (x, y) in zip(
+                    (100_000, 200_000, 300_000, 400_000), quadrants_starts
+                )
+            ]
+        )
+        safety_factor = get_safety_factor(robots, 10**9, Grid(101, 103))
+        assert safety_factor == 2_400_000_000_000_000_000_000
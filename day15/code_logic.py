@@ -1,257 +1,224 @@
-from dataclasses import dataclass
-from itertools import chain
+from functools import partial
 import os.path
-import time
-from typing import List, Tuple
+import struct
+from typing import BinaryIO, Callable, List, Optional, Tuple
 import dotenv
 
-from utils.utils import get_input_if_not_exists, read_input_lines
+from utils.utils import get_input_if_not_exists
 
 dotenv.load_dotenv()
 
 
 ## Implementation of PART 1
 
+WALL, EMPTY, BOX, ROBOT = b"#", b".", b"O", b"@"
+BOX_LEFT, BOX_RIGHT = b"[", b"]"
+MOVEMENT_BYTES = frozenset(b"v^<>")
 
-class Item:
-    def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
 
+class Warehouse:
+    """Warehouse stored as a flat byte grid, updated in place by the robot moves.
 
-class MovableItem(Item):
-    def __init__(self, x: int, y: int):
-        super().__init__(x, y)
+    Wide boxes are stored as their "[" and "]" halves, so the other half of a
+    box is always the neighbouring cell. The sum of the boxes GPS coordinates
+    is kept up to date with every push.
+    """
 
-    def move(self, dx, dy):
-        self.x += dx
-        self.y += dy
-
-
-class Box(MovableItem):
-    def __init__(self, x: int, y: int):
-        super().__init__(x, y)
-
-    def getGPS(self):
-        return self.x + 100 * self.y
-
-    def get_positions(self) -> List[Tuple[int, int]]:
-        return [(self.x, self.y)]
+    directions_mapping = {"v": (0, 1), "^": (0, -1), "<": (-1, 0), ">": (1, 0)}
 
+    # Snapshot header: width, height, robot cell, offset of the next move in the
+    # input file and GPS sum, followed by the grid cells
+    snapshot_header = struct.Struct("<QQQQQ")
 
-class Grid:
+    def __init__(self, cells: bytearray, width: int, robot: int, gps_sum: int):
+        self.cells = cells
+        self.width, self.height = width, len(cells) // width
+        self.robot = robot
+        self.gps_sum = gps_sum
 
-    directions_mapping = {"v": (0, 1), "^": (0, -1), "<": (-1, 0), ">": (1, 0)}
+    @classmethod
+    def from_lines(cls, lines: List[str]):
+        cells = bytearray("".join(lines), "ascii")
+        robot = cells.index(ROBOT)
+        cells[robot] = EMPTY[0]
+        width = len(lines[0])
+        gps_sum = sum(
+            cell % width + 100 * (cell // width)
+            for cell, char in enumerate(cells)
+            if char in (BOX[0], BOX_LEFT[0])
+        )
+        return cls(cells, width, robot, gps_sum)
 
-    def __init__(
-        self,
-        box_coords: List[Tuple[int, int]],
-        robot_coords: Tuple[int, int],
-        obstacles: List[Tuple[int, int]],
-    ):
-        self.boxes = [Box(x, y) for x, y in box_coords]
-        self.robot = MovableItem(*robot_coords)
-        self.obstacles = [Item(x, y) for x, y in obstacles]
-        self._update_positions_sets()
-        self.max_x = max([x for x, _ in box_coords + [robot_coords] + obstacles])
-        self.max_y = max([y for _, y in box_coords + [robot_coords] + obstacles])
+    def to_snapshot(self, movements_offset: int) -> bytes:
+        header = self.snapshot_header.pack(
+            self.width, self.height, self.robot, movements_offset, self.gps_sum
+        )
+        return header + self.cells
 
     @classmethod
-    def from_lines(cls, lines: List[str], box_char="O"):
-        box_coords = []
-        robot_coords = None
-        obstacle_coords = []
-        for y, line in enumerate(lines):
-            for x, char in enumerate(line):
-                if char == box_char:
-                    box_coords.append((x, y))
-                elif char == "@":
-                    robot_coords = (x, y)
-                elif char == "#":
-                    obstacle_coords.append((x, y))
-        return cls(box_coords, robot_coords, obstacle_coords)
-
-    def _update_positions_sets(self):
-        self.boxes_positions = set(
-            chain.from_iterable(box.get_positions() for box in self.boxes)
+    def from_snapshot(cls, snapshot: bytes) -> Tuple["Warehouse", int]:
+        """Warehouse saved in the snapshot, and the offset of its next move."""
+        width, height, robot, movements_offset, gps_sum = (
+            cls.snapshot_header.unpack_from(snapshot)
         )
-        self.obstacles_positions = {
-            (obstacle.x, obstacle.y) for obstacle in self.obstacles
-        }
+        cells = bytearray(snapshot[cls.snapshot_header.size :])
+        if len(cells) != width * height:
+            raise ValueError("Snapshot cells do not match its dimensions")
+        return cls(cells, width, robot, gps_sum), movements_offset
 
     def attempt_robot_move(self, direction: str):
         dx, dy = self.directions_mapping[direction]
-        boxes_in_path = set()
-        for n_steps_ahead in range(1, self.max_y):
-
-            next_position = (
-                self.robot.x + n_steps_ahead * dx,
-                self.robot.y + n_steps_ahead * dy,
+        step = dx + dy * self.width
+        next_cell = self.robot + step
+        next_char = self.cells[next_cell]
+        if next_char == EMPTY[0]:
+            self.robot = next_cell
+        elif next_char == WALL[0]:
+            return
+        elif dy == 0 or next_char == BOX[0]:
+            self._push_in_line(next_cell, step)
+        else:
+            self._push_wide_boxes(next_cell, step)
+
+    def _push_in_line(self, first_cell: int, step: int):
+        # Boxes pushed in line move as a block: only both ends of the row change
+        end_cell = first_cell
+        while self.cells[end_cell] in (BOX[0], BOX_LEFT[0], BOX_RIGHT[0]):
+            end_cell += step
+        if self.cells[end_cell] != EMPTY[0]:
+            return
+        nb_pushed_cells = abs(end_cell - first_cell) // abs(step)
+        if self.cells[first_cell] == BOX[0]:
+            self.cells[end_cell] = BOX[0]
+            nb_boxes = nb_pushed_cells
+        else:
+            low, high = sorted((first_cell, end_cell))
+            self.cells[low : high + 1] = (
+                self.cells[low + 1 : high + 1] + EMPTY
+                if step < 0
+                else EMPTY + self.cells[low:high]
             )
-
-            if next_position in self.boxes_positions:
-                boxes_in_path.add(next_position)
-                continue
-            if next_position in self.obstacles_positions:
-                return
-            break
-        if boxes_in_path:
-            for box in self.boxes:
-                if (box.x, box.y) in boxes_in_path:
-                    box.move(dx, dy)
-            self._update_positions_sets()
-
-        self.robot.move(dx, dy)
+            nb_boxes = nb_pushed_cells // 2
+        self.cells[first_cell] = EMPTY[0]
+        self.gps_sum += nb_boxes * self._step_gps(step)
+        self.robot = first_cell
+
+    def _push_wide_boxes(self, first_cell: int, step: int):
+        # Boxes pushed vertically form a tree: collect it row by row, by the
+        # cells of their left halves, and stop at the first wall
+        def _box_left_cell(cell):
+            return cell if self.cells[cell] == BOX_LEFT[0] else cell - 1
+
+        pushed_boxes = list()
+        front = {_box_left_cell(first_cell)}
+        while front:
+            pushed_boxes.extend(front)
+            next_front = set()
+            for box_cell in front:
+                for cell in (box_cell + step, box_cell + 1 + step):
+                    char = self.cells[cell]
+                    if char == WALL[0]:
+                        return
+                    if char in (BOX_LEFT[0], BOX_RIGHT[0]):
+                        next_front.add(_box_left_cell(cell))
+            front = next_front
+
+        for box_cell in reversed(pushed_boxes):
+            self.cells[box_cell : box_cell + 2] = EMPTY * 2
+            self.cells[box_cell + step : box_cell + step + 2] = BOX_LEFT + BOX_RIGHT
+        self.gps_sum += len(pushed_boxes) * self._step_gps(step)
+        self.robot = first_cell
+
+    def _step_gps(self, step: int) -> int:
+        return 100 * (step // self.width) if abs(step) > 1 else step
 
     def get_cumulative_gps(self):
-        return sum([box.getGPS() for box in self.boxes])
+        return self.gps_sum
+
+    def get_lines(self) -> List[str]:
+        cells = bytearray(self.cells)
+        cells[self.robot] = ROBOT[0]
+        return [
+            cells[y * self.width : (y + 1) * self.width].decode("ascii")
+            for y in range(self.height)
+        ]
 
     def print_grid(self):
-        for y in range(self.max_y + 1):
-            for x in range(self.max_x + 1):
-                if (x, y) in self.boxes_positions:
-                    print("O", end="")
-                elif (x, y) in self.obstacles_positions:
-                    print("#", end="")
-                elif (x, y) == (self.robot.x, self.robot.y):
-                    print("@", end="")
-                else:
-                    print(".", end="")
-            print()
+        for line in self.get_lines():
+            print(line)
 
 
-def solve_level1(filename: str):
-    lines = read_input_lines(filename)
-    splitting_line = lines.index("")
-    grid = Grid.from_lines(lines[:splitting_line])
-    movements = "".join(lines[splitting_line + 1 :])
-    # grid.print_grid()
-    for movement in movements:
-        # print(movement)
-        grid.attempt_robot_move(movement)
-        # grid.print_grid()
+def read_warehouse_lines(f: BinaryIO) -> List[str]:
+    """Read the warehouse map, leaving the file positioned on the first move."""
+    lines = list()
+    for line in iter(f.readline, b""):
+        line = line.rstrip(b"\r\n")
+        if not line:
+            break
+        lines.append(line.decode("ascii"))
+    return lines
+
+
+def execute_movements_stream(
+    filename: str,
+    augmented: bool = False,
+    snapshot: Optional[bytes] = None,
+    checkpoint_every: Optional[int] = None,
+    on_checkpoint: Optional[Callable[[bytes], None]] = None,
+    chunk_size: int = 1 << 16,
+) -> Warehouse:
+    """Run the moves of the input file, reading them by chunks.
+
+    Every `checkpoint_every` moves, a snapshot of the warehouse is given to
+    `on_checkpoint`. Passing one of those snapshots back resumes the run from
+    where it was taken, without reading the moves already executed.
+    """
+    if checkpoint_every and on_checkpoint is None:
+        raise ValueError("Checkpoints need an on_checkpoint callback")
+    with open(filename, "rb") as f:
+        if snapshot is None:
+            lines = read_warehouse_lines(f)
+            if augmented:
+                lines = augment_lines(lines)
+            warehouse = Warehouse.from_lines(lines)
+        else:
+            warehouse, movements_offset = Warehouse.from_snapshot(snapshot)
+            f.seek(movements_offset)
+
+        nb_moves = 0
+        chunk_offset = f.tell()
+        for chunk in iter(partial(f.read, chunk_size), b""):
+            for idx, movement in enumerate(chunk):
+                if movement not in MOVEMENT_BYTES:
+                    continue
+                warehouse.attempt_robot_move(chr(movement))
+                nb_moves += 1
+                if checkpoint_every and nb_moves % checkpoint_every == 0:
+                    on_checkpoint(warehouse.to_snapshot(chunk_offset + idx + 1))
+            chunk_offset += len(chunk)
+    return warehouse
 
-    result = grid.get_cumulative_gps()
 
-    return result
+def solve_level1(filename: str):
+    return execute_movements_stream(filename).get_cumulative_gps()
 
 
 ## Implementation of PART 2
-class BigBox(Box):
-    def __init__(self, x: int, y: int):
-        super().__init__(x, y)
-        self.x2 = x + 1
-
-    def getGPS(self):
-        return self.x + 100 * self.y
-
-    def move_large(self, dx, dy):
-        self.move(dx, dy)
-        self.x2 += dx
-
-    def get_positions(self) -> List[Tuple[int, int]]:
-        return [(self.x, self.y), (self.x2, self.y)]
-
-
-class AugmentedGrid(Grid):
-    augmentation_mapping = {
-        "#": "##",
-        "O": "[]",
-        ".": "..",
-        "@": "@.",
-    }
-
-    def __init__(
-        self,
-        box_coords: List[Tuple[int, int]],
-        robot_coords: Tuple[int, int],
-        obstacles: List[Tuple[int, int]],
-    ):
-        super().__init__(box_coords, robot_coords, obstacles)
-        self.boxes = [BigBox(x, y) for x, y in box_coords]
-        self._update_positions_sets()
 
-    @classmethod
-    def from_augmented_lines(cls, lines: List[str]):
-        augmented_lines = [
-            "".join([cls.augmentation_mapping[char] for char in line]) for line in lines
-        ]
-        return cls.from_lines(augmented_lines, box_char="[")
+augmentation_mapping = {
+    "#": "##",
+    "O": "[]",
+    ".": "..",
+    "@": "@.",
+}
 
-    def attempt_robot_move(self, direction: str):
-        dx, dy = self.directions_mapping[direction]
-        boxes_in_path = list()
-        for n_steps_ahead in range(1, self.max_y):
-            if not boxes_in_path:
-                next_positions = {
-                    (
-                        self.robot.x + n_steps_ahead * dx,
-                        self.robot.y + n_steps_ahead * dy,
-                    )
-                }
-            else:
-                last_boxes_positions = chain.from_iterable(
-                    (box.get_positions() for box in next_step_boxes)
-                )
-                next_positions = {(x + dx, y + dy) for x, y in last_boxes_positions}
-                next_step_boxes = list()
-
-            if not next_positions.isdisjoint(self.obstacles_positions):
-                return
-
-            if not next_positions.isdisjoint(self.boxes_positions):
-                next_step_boxes = [
-                    box
-                    for box in self.boxes
-                    if (box.x, box.y) in next_positions
-                    or (box.x2, box.y) in next_positions
-                ]
-                boxes_in_path.extend(next_step_boxes)
-                continue
-
-            break
-        if boxes_in_path:
-            for box in set(boxes_in_path):
-                box.move_large(dx, dy)
-            self._update_positions_sets()
 
-        self.robot.move(dx, dy)
-
-    def get_cumulative_gps(self):
-        return sum([box.getGPS() for box in self.boxes])
-
-    def print_augmented_grid(self):
-        for y in range(self.max_y + 1):
-            line = ""
-            for x in range(self.max_x + 1):
-                if (x, y) in self.boxes_positions:
-                    if line[-1] == "[":
-                        line += "]"
-                    else:
-                        line += "["
-                elif (x, y) in self.obstacles_positions:
-                    line += "#"
-                elif (x, y) == (self.robot.x, self.robot.y):
-                    line += "@"
-                else:
-                    line += "."
-            print(line)
+def augment_lines(lines: List[str]) -> List[str]:
+    return ["".join([augmentation_mapping[char] for char in line]) for line in lines]
 
 
 def solve_level2(filename: str):
-    lines = read_input_lines(filename)
-    splitting_line = lines.index("")
-    grid = AugmentedGrid.from_augmented_lines(lines[:splitting_line])
-    movements = "".join(lines[splitting_line + 1 :])
-    # grid.print_augmented_grid()
-    for movement in movements:
-        # print(movement)
-        grid.attempt_robot_move(movement)
-        # grid.print_augmented_grid()
-
-    result = grid.get_cumulative_gps()
-
-    return result
+    return execute_movements_stream(filename, augmented=True).get_cumulative_gps()
 
 
 if __name__ == "__main__":
@@ -1,5 +1,8 @@
 import os
-from code_logic import solve_level1, solve_level2
+
+import pytest
+
+from code_logic import Warehouse, execute_movements_stream, solve_level1, solve_level2
 
 current_directory = os.path.dirname(__file__)
 
@@ -9,11 +12,41 @@ class TestAdventOfCode:
     def test_part1_sample(self):
         assert solve_level1(f"{current_directory}/sample1.txt") == 10092
 
+    def test_part1_sample2(self):
+        assert solve_level1(f"{current_directory}/sample2.txt") == 2028
+
     def test_part1_input(self):
-        assert solve_level1(f"{current_directory}/input1.txt") == 1524905
+        assert solve_level1(f"{current_directory}/input1.txt") == 1495147
 
     def test_part2_sample(self):
         assert solve_level2(f"{current_directory}/sample1.txt") == 9021
 
     def test_part2_input(self):
         assert solve_level2(f"{current_directory}/input2.txt") == 1524905
+
+    def test_part2_resume_from_checkpoint(self):
+        filename = f"{current_directory}/input2.txt"
+        snapshots = list()
+        warehouse = execute_movements_stream(
+            filename,
+            augmented=True,
+            checkpoint_every=1000,
+            on_checkpoint=snapshots.append,
+            chunk_size=777,
+        )
+        resumed_warehouse = execute_movements_stream(
+            filename, snapshot=snapshots[len(snapshots) // 2]
+        )
+        assert resumed_warehouse.get_lines() == warehouse.get_lines()
+        assert resumed_warehouse.get_cumulative_gps() == 1524905
+
+    def test_stream_argument_checks(self):
+        filename = f"{current_directory}/sample1.txt"
+        with pytest.raises(ValueError):
+            execute_movements_stream(filename, checkpoint_every=10)
+        snapshots = list()
+        execute_movements_stream(
+            filename, checkpoint_every=10, on_checkpoint=snapshots.append
+        )
+        with pytest.raises(ValueError):
+            Warehouse.from_snapshot(snapshots[0][:-1])
@@ -1,5 +1,8 @@
+from abc import ABC, abstractmethod
+import heapq
+import math
 import os.path
-from typing import List, Tuple
+from typing import Iterator, List, Optional, Set, Tuple
 
 import dotenv
 from utils.utils import get_input_if_not_exists, read_input_lines
@@ -7,162 +10,290 @@ from utils.utils import get_input_if_not_exists, read_input_lines
 dotenv.load_dotenv()
 
 
-class HypotheticReindeer:
-    def __init__(
-        self, position: Tuple[int, int], direction: Tuple[int, int], cum_cost: int
-    ) -> None:
-        self.direction = direction
-        self.position = position
-        self.cum_cost = cum_cost
+# Clockwise order, so turning is moving to the next or previous direction
+DIRECTIONS = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+EAST = 0
+STEP_COST, TURN_COST = 1, 1000
 
 
 ## Implementation of PART 1
-class Maze:
-    def __init__(self, array):
-        self.array = array
-        self.start_coords = self.get_positions_by_character("S")[0]
-        self.end_coords = self.get_positions_by_character("E")[0]
-        self.walls_set = set(self.get_positions_by_character("#"))
-        self.exploring_cost_mapping = self.get_cost_mapping()
-        self.leaving_cost_mapping = dict()
-        self.exploration_queue = [
-            (self.start_coords, HypotheticReindeer(self.start_coords, (1, 0), 0))
-        ]
-
-    def get_positions_by_character(self, character):
-        coords_list = list()
-        for j, row in enumerate(self.array):
-            for i, char in enumerate(row):
-                if char == character:
-                    coords_list.append((i, j))
-        return coords_list
-
-    def get_cost_mapping(self):
-        cost_mapping = dict()
-        known_coords = self.walls_set
-        for j, row in enumerate(self.array):
-            for i, char in enumerate(row):
-                if (i, j) in known_coords:
-                    continue
-                cost_mapping[(i, j)] = 100_000_000
-        cost_mapping[self.start_coords] = 0
-        return cost_mapping
+class StateGraph(ABC):
+    """Search over states numbered `node * 4 + direction`."""
+
+    nb_states: int
+    start_state: int
+    end_node: int
+
+    @abstractmethod
+    def get_next_states(self, state: int) -> Iterator[Tuple[int, int]]: ...
+
+    @abstractmethod
+    def get_previous_states(self, state: int) -> Iterator[Tuple[int, int]]: ...
+
+    @abstractmethod
+    def estimate_remaining_cost(self, state: int) -> int: ...
+
+    def compute_distance_field(
+        self,
+        source_states: List[int],
+        reverse: bool = False,
+        stop_node: Optional[int] = None,
+        max_cost: float = math.inf,
+        use_heuristic: bool = False,
+    ) -> List[float]:
+        """Cheapest cost of every state from the sources (or to them, with `reverse`),
+        settled up to `max_cost` or to the cost of reaching `stop_node`.
+        """
+        if use_heuristic and (reverse or stop_node != self.end_node):
+            raise ValueError("The heuristic only estimates forward costs to the end")
+        estimate = self.estimate_remaining_cost if use_heuristic else lambda _: 0
+        get_neighbour_states = (
+            self.get_previous_states if reverse else self.get_next_states
+        )
+        costs = [math.inf] * self.nb_states
+        for state in source_states:
+            costs[state] = 0
+        queue = [(estimate(state), 0, state) for state in source_states]
+        heapq.heapify(queue)
+        while queue:
+            priority, cost, state = heapq.heappop(queue)
+            if priority > max_cost:
+                break
+            if cost > costs[state]:
+                continue
+            if state // 4 == stop_node:
+                max_cost = min(max_cost, cost)
+                continue
+            for next_state, step_cost in get_neighbour_states(state):
+                next_cost = cost + step_cost
+                if next_cost < costs[next_state]:
+                    costs[next_state] = next_cost
+                    heapq.heappush(
+                        queue, (next_cost + estimate(next_state), next_cost, next_state)
+                    )
+        return costs
 
-    def update_position_cost(self, position, cost):
-        self.exploring_cost_mapping[position] = cost
+    def get_end_states(self) -> List[int]:
+        return [self.end_node * 4 + direction for direction in range(4)]
 
-    def update_leaving_cost(self, position, cost):
-        self.leaving_cost_mapping[position] = min(
-            [self.leaving_cost_mapping.get(position, 100_000_000), cost]
+    def get_cost_to_end(self, use_heuristic: bool = False) -> int:
+        costs = self.compute_distance_field(
+            [self.start_state], stop_node=self.end_node, use_heuristic=use_heuristic
         )
+        return min(costs[state] for state in self.get_end_states())
 
-    def explore_position(self, exploration_tuple):
-        current_pos, reindeer = exploration_tuple
-        if current_pos == self.end_coords:
-            return
-
-        for offset in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-            next_pos = (current_pos[0] + offset[0], current_pos[1] + offset[1])
-            step_cost: int = 1 + 1000 * int(offset != reindeer.direction)
-            if next_pos in self.walls_set:
-                continue
-            if (
-                self.leaving_cost_mapping.get(next_pos, 100_000_000)
-                >= reindeer.cum_cost + step_cost
-            ):
-                cost = reindeer.cum_cost + step_cost
-                self.update_position_cost(next_pos, cost)
-                self.update_leaving_cost(current_pos, cost)
-                if next_pos == self.end_coords:
-                    self.update_leaving_cost(next_pos, cost + step_cost)
-                self.exploration_queue.append(
-                    (
-                        next_pos,
-                        HypotheticReindeer(
-                            next_pos, offset, self.exploring_cost_mapping.get(next_pos)
-                        ),
-                    )
-                )
+    def compute_best_paths_costs(self) -> Tuple[List[float], List[float], int]:
+        """Costs from the start and to the end of every state, and the best cost."""
+        costs_from_start = self.compute_distance_field(
+            [self.start_state], stop_node=self.end_node
+        )
+        best_cost = min(costs_from_start[state] for state in self.get_end_states())
+        costs_to_end = self.compute_distance_field(
+            self.get_end_states(), reverse=True, max_cost=best_cost
+        )
+        return costs_from_start, costs_to_end, best_cost
 
-    def explore_grid(self):
-        while self.exploration_queue:
-            exploration_tuple = self.exploration_queue.pop(0)
-            self.explore_position(exploration_tuple)
 
-    def get_cost_to_end(self):
-        return self.exploring_cost_mapping.get(self.end_coords)
+class Maze(StateGraph):
+    """Reindeer maze searched over `cell * 4 + direction` states, cells being
+    `y * width + x` in a maze surrounded by walls.
+    """
 
-    def print_grid(self, grid, cell_length=5):
+    def __init__(self, array):
+        self.array = array
+        self.width = len(array[0])
+        self.walls = bytearray(char == "#" for row in array for char in row)
+        self.start_cell = self.get_cell_by_character("S")
+        self.end_cell = self.get_cell_by_character("E")
+        self.step_offsets = [dx + dy * self.width for dx, dy in DIRECTIONS]
+        self.nb_states = len(self.walls) * 4
+        self.start_state = self.start_cell * 4 + EAST
+        self.end_node = self.end_cell
+
+    def get_cell_by_character(self, character):
         for j, row in enumerate(self.array):
-            row_to_print = list()
             for i, char in enumerate(row):
-                if char == "#":
-                    row_to_print.append("#" * cell_length + " | ")
+                if char == character:
+                    return j * self.width + i
+        return None
+
+    def get_next_states(self, state: int) -> Iterator[Tuple[int, int]]:
+        cell, direction = divmod(state, 4)
+        next_cell = cell + self.step_offsets[direction]
+        if not self.walls[next_cell]:
+            yield next_cell * 4 + direction, STEP_COST
+        yield cell * 4 + (direction + 1) % 4, TURN_COST
+        yield cell * 4 + (direction + 3) % 4, TURN_COST
+
+    def get_previous_states(self, state: int) -> Iterator[Tuple[int, int]]:
+        cell, direction = divmod(state, 4)
+        previous_cell = cell - self.step_offsets[direction]
+        if not self.walls[previous_cell]:
+            yield previous_cell * 4 + direction, STEP_COST
+        yield cell * 4 + (direction + 1) % 4, TURN_COST
+        yield cell * 4 + (direction + 3) % 4, TURN_COST
+
+    def estimate_remaining_cost(self, state: int) -> int:
+        """Lower bound of the cost to the end: distance plus unavoidable turns."""
+        cell, direction = divmod(state, 4)
+        dy, dx = divmod(self.end_cell, self.width)
+        y, x = divmod(cell, self.width)
+        dx, dy = dx - x, dy - y
+        needed_directions = set()
+        if dx:
+            needed_directions.add(EAST if dx > 0 else 2)
+        if dy:
+            needed_directions.add(1 if dy > 0 else 3)
+        if not needed_directions:
+            nb_turns = 0
+        elif direction in needed_directions:
+            nb_turns = len(needed_directions) - 1
+        elif len(needed_directions) == 1 and (direction + 2) % 4 in needed_directions:
+            nb_turns = 2
+        else:
+            nb_turns = len(needed_directions)
+        return abs(dx) + abs(dy) + TURN_COST * nb_turns
+
+    def count_open_neighbours(self, cell: int) -> int:
+        return sum(not self.walls[cell + offset] for offset in self.step_offsets)
+
+    def get_best_paths_cells(self) -> Set[int]:
+        costs_from_start, costs_to_end, best_cost = self.compute_best_paths_costs()
+        return {
+            state // 4
+            for state, (cost_from_start, cost_to_end) in enumerate(
+                zip(costs_from_start, costs_to_end)
+            )
+            if cost_from_start + cost_to_end == best_cost
+        }
+
+
+class JunctionGraph(StateGraph):
+    """Maze whose corridors are collapsed into edges between junctions, each
+    edge costing the steps and turns of its corridor.
+    """
+
+    def __init__(self, maze: Maze):
+        self.maze = maze
+        self.junction_cells = [
+            cell
+            for cell, is_wall in enumerate(maze.walls)
+            if not is_wall
+            and (
+                cell in (maze.start_cell, maze.end_cell)
+                or maze.count_open_neighbours(cell) != 2
+            )
+        ]
+        self.junction_indices = {
+            cell: junction for junction, cell in enumerate(self.junction_cells)
+        }
+        self.nb_states = len(self.junction_cells) * 4
+        self.start_state = self.junction_indices[maze.start_cell] * 4 + EAST
+        self.end_node = self.junction_indices[maze.end_cell]
+        # Edge of a state: (arrival state, cost, corridor id), corridor id being
+        # None when the two junctions are adjacent
+        self.next_edges: List[Optional[Tuple[int, int, Optional[int]]]] = [
+            None
+        ] * self.nb_states
+        self.previous_edges: List[Optional[Tuple[int, int, Optional[int]]]] = [
+            None
+        ] * self.nb_states
+        self.corridors: List[List[int]] = list()
+        self.build_edges()
+
+    def follow_corridor(self, cell: int, direction: int) -> Tuple[int, int, List[int]]:
+        """Arrival state, cost and corridor cells of the walk to the next junction."""
+        walls, step_offsets = self.maze.walls, self.maze.step_offsets
+        cell += step_offsets[direction]
+        cost = STEP_COST
+        corridor_cells = list()
+        while cell not in self.junction_indices:
+            corridor_cells.append(cell)
+            for next_direction in (direction, (direction + 1) % 4, (direction + 3) % 4):
+                if not walls[cell + step_offsets[next_direction]]:
+                    break
+            if next_direction != direction:
+                cost += TURN_COST
+                direction = next_direction
+            cell += step_offsets[direction]
+            cost += STEP_COST
+        return self.junction_indices[cell] * 4 + direction, cost, corridor_cells
+
+    def build_edges(self):
+        walls, step_offsets = self.maze.walls, self.maze.step_offsets
+        corridor_ids = dict()
+        for junction, cell in enumerate(self.junction_cells):
+            for direction in range(4):
+                if walls[cell + step_offsets[direction]]:
                     continue
-                string_to_append = str(grid.get((i, j)))
-
-                row_to_print.append(
-                    string_to_append
-                    + (cell_length - len(string_to_append)) * " "
-                    + " | "
-                )
-            print("".join(row_to_print))
-
-    def print_leaving_grid(self, cell_length=5):
-        self.print_grid(self.leaving_cost_mapping, cell_length)
+                next_state, cost, corridor_cells = self.follow_corridor(cell, direction)
+                corridor_id = None
+                if corridor_cells:
+                    # Each corridor is walked once from each end
+                    corridor_id = corridor_ids.get(corridor_cells[0])
+                    if corridor_id is None:
+                        corridor_id = len(self.corridors)
+                        self.corridors.append(corridor_cells)
+                        corridor_ids[corridor_cells[0]] = corridor_id
+                        corridor_ids[corridor_cells[-1]] = corridor_id
+                state = junction * 4 + direction
+                self.next_edges[state] = (next_state, cost, corridor_id)
+                self.previous_edges[next_state] = (state, cost, corridor_id)
+
+    def get_next_states(self, state: int) -> Iterator[Tuple[int, int]]:
+        edge = self.next_edges[state]
+        if edge is not None:
+            yield edge[0], edge[1]
+        junction, direction = divmod(state, 4)
+        yield junction * 4 + (direction + 1) % 4, TURN_COST
+        yield junction * 4 + (direction + 3) % 4, TURN_COST
+
+    def get_previous_states(self, state: int) -> Iterator[Tuple[int, int]]:
+        edge = self.previous_edges[state]
+        if edge is not None:
+            yield edge[0], edge[1]
+        junction, direction = divmod(state, 4)
+        yield junction * 4 + (direction + 1) % 4, TURN_COST
+        yield junction * 4 + (direction + 3) % 4, TURN_COST
+
+    def estimate_remaining_cost(self, state: int) -> int:
+        junction, direction = divmod(state, 4)
+        return self.maze.estimate_remaining_cost(
+            self.junction_cells[junction] * 4 + direction
+        )
 
-    def print_exploring_grid(self, cell_length=5):
-        self.print_grid(self.exploring_cost_mapping, cell_length)
+    def get_best_paths_cells(self) -> Set[int]:
+        """Junction cells on a best path, plus the cells of the corridors whose
+        edge is taken by a best path."""
+        costs_from_start, costs_to_end, best_cost = self.compute_best_paths_costs()
+        best_paths_cells = set()
+        for state, cost_from_start in enumerate(costs_from_start):
+            if cost_from_start + costs_to_end[state] == best_cost:
+                best_paths_cells.add(self.junction_cells[state // 4])
+            edge = self.next_edges[state]
+            if edge is None or edge[2] is None:
+                continue
+            next_state, cost, corridor_id = edge
+            if cost_from_start + cost + costs_to_end[next_state] == best_cost:
+                best_paths_cells.update(self.corridors[corridor_id])
+        return best_paths_cells
 
 
 def solve_level1(filename: str):
     lines = read_input_lines(filename)
     array = [[char for char in line] for line in lines]
-    maze = Maze(array)
-    maze.explore_grid()
-    maze.print_exploring_grid()
-    maze.print_leaving_grid()
-
-    return maze.get_cost_to_end()
+    graph = JunctionGraph(Maze(array))
+    return graph.get_cost_to_end()
 
 
 ## Implementation of PART 2
-class BackwardableMaze(Maze):
-    def __init__(self, array):
-        super().__init__(array)
-        self.backwards_exploration_queue = [self.end_coords]
-        self.valid_paths_coords = set([self.end_coords])
-
-    def explore_backwards(self):
-        self.leaving_cost_mapping[self.end_coords] = (
-            self.exploring_cost_mapping.get(self.end_coords) + 1
-        )
-
-        while self.backwards_exploration_queue:
-            current_pos = self.backwards_exploration_queue.pop(0)
-            self.explore_position_backwards(current_pos)
-
-    def explore_position_backwards(self, coords):
-        for offset in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-            next_pos = (coords[0] + offset[0], coords[1] + offset[1])
-            if next_pos in self.walls_set:
-                continue
-            if self.leaving_cost_mapping.get(
-                next_pos, 100_000_000
-            ) < self.leaving_cost_mapping.get(coords):
-                self.backwards_exploration_queue.append(next_pos)
-                self.valid_paths_coords.add(next_pos)
 
 
 def solve_level2(filename: str):
     lines = read_input_lines(filename)
     array = [[char for char in line] for line in lines]
-    maze = BackwardableMaze(array)
-    maze.explore_grid()
-    maze.explore_backwards()
-    # maze.print_exploring_grid()
-    # maze.print_leaving_grid()
-    return len(maze.valid_paths_coords)
+    graph = JunctionGraph(Maze(array))
+    return len(graph.get_best_paths_cells())
 
 
 if __name__ == "__main__":
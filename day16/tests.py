@@ -1,6 +1,9 @@
 import os
 
-from code_logic import solve_level1, solve_level2
+import pytest
+
+from code_logic import JunctionGraph, Maze, StateGraph, solve_level1, solve_level2
+from utils.utils import read_input_lines
 
 current_directory = os.path.dirname(__file__)
 
@@ -24,3 +27,27 @@ class TestAdventOfCode:
 
     def test_part2_input(self):
         assert solve_level2(f"{current_directory}/input2.txt") == 541
+
+    def test_part1_heuristic_matches_dijkstra(self):
+        lines = read_input_lines(f"{current_directory}/input1.txt")
+        maze = Maze([list(line) for line in lines])
+        assert maze.get_cost_to_end() == 135512
+        assert maze.get_cost_to_end(use_heuristic=True) == 135512
+
+    def test_junction_graph_matches_maze(self):
+        lines = read_input_lines(f"{current_directory}/input2.txt")
+        maze = Maze([list(line) for line in lines])
+        graph = JunctionGraph(maze)
+        nb_open_states = 4 * (len(maze.walls) - sum(maze.walls))
+        assert graph.nb_states < nb_open_states // 7
+        assert graph.get_cost_to_end() == maze.get_cost_to_end()
+        assert graph.get_cost_to_end(use_heuristic=True) == maze.get_cost_to_end()
+        assert graph.get_best_paths_cells() == maze.get_best_paths_cells()
+
+    def test_incomplete_state_graph_fails_at_construction(self):
+        class ForwardOnlyGraph(StateGraph):
+            def get_next_states(self, state):
+                yield from ()
+
+        with pytest.raises(TypeError):
+            ForwardOnlyGraph()
@@ -1,136 +1,272 @@
 import os.path
-from typing import Dict, List, Tuple
+from typing import List, Optional, Tuple
 import dotenv
+import numpy as np
 
-from utils.utils import get_input_if_not_exists, read_input_lines
+from utils.utils import get_input_if_not_exists, iter_input_sections
 
 dotenv.load_dotenv()
 
 
 ## Implementation of PART 1
 
-
-def split_input_lines(lines: List[str]) -> Tuple[List[str], List[str]]:
-    split_idx = [idx for idx, line in enumerate(lines) if line == ""][0]
-    return lines[:split_idx], lines[split_idx + 1 :]
-
-
-class Instruction:
-    def __init__(self, opcode: int, operand: int, register: Dict[str, int]):
-        self.opcode = opcode
-        self.operand = operand
-        self.register = register
-        self.instruction_pointer = None
-
-    @property
-    def combo_operand(self):
-        if self.operand <= 3:
-            return self.operand
-        elif self.operand == 7:
-            raise ValueError("Operand cannot be 7")
+def read_computer_input(filename: str) -> Tuple[Tuple[int, ...], List[int]]:
+    register_input, program_input = iter_input_sections(filename)
+    registers = tuple(int(line.split(": ")[1]) for line in register_input)
+    program = [int(val) for val in program_input[0].split(": ")[1].split(",")]
+    return registers, program
+
+
+# Sources of decoded operands: the literal value, or one of the registers
+LITERAL, REGISTER_A, REGISTER_B, REGISTER_C = range(4)
+COMBO_OPCODES = (0, 2, 5, 6, 7)
+INVALID_OPCODE = -1
+# Outputs of batched runs are packed, 3 bits per value, in uint64 words
+VALUES_PER_WORD = 21
+
+
+def decode_program(program: List[int]) -> List[Tuple[int, int, int]]:
+    """(opcode, value, source) for every pointer, `source` being LITERAL or
+    the register holding the operand.
+    """
+    instructions = list()
+    for opcode, operand in zip(program[:-1], program[1:]):
+        if opcode not in COMBO_OPCODES or operand < 4:
+            instructions.append((opcode, operand, LITERAL))
+        elif operand == 7:
+            instructions.append((INVALID_OPCODE, operand, LITERAL))
         else:
-            return self.register["ABC"[self.operand - 4]]
-
-    def run(self, output):
-        match self.opcode:
-            case 0:
-                self.register["A"] = int(self.register["A"] / 2**self.combo_operand)
-            case 1:
-                self.register["B"] = self.operand ^ self.register["B"]
-            case 2:
-                self.register["B"] = self.combo_operand % 8
-            case 3:
-                if self.register["A"] > 0:
-                    self.instruction_pointer = self.operand
-            case 4:
-                self.register["B"] = self.register["B"] ^ self.register["C"]
-            case 5:
-                output.append(self.combo_operand % 8)
-            case 6:
-                self.register["B"] = int(self.register["A"] / 2**self.combo_operand)
-            case 7:
-                self.register["C"] = int(self.register["A"] / 2**self.combo_operand)
+            instructions.append((opcode, 0, operand - 3))
+    return instructions
+
+
+class Computer:
+    """3-bit computer running a program decoded once, registers kept in locals."""
+
+    def __init__(self, program: List[int]):
+        self.program = program
+        self.instructions = decode_program(program)
+
+    def run(self, a: int, b: int = 0, c: int = 0) -> List[int]:
+        instructions = self.instructions
+        nb_instructions = len(instructions)
+        output = list()
+        ip = 0
+        while ip < nb_instructions:
+            opcode, value, source = instructions[ip]
+            if source:
+                value = a if source == REGISTER_A else b if source == REGISTER_B else c
+            if opcode == 0:
+                a >>= value
+            elif opcode == 1:
+                b ^= value
+            elif opcode == 2:
+                b = value & 7
+            elif opcode == 3:
+                if a:
+                    ip = value
+                    continue
+            elif opcode == 4:
+                b ^= c
+            elif opcode == 5:
+                output.append(value & 7)
+            elif opcode == 6:
+                b = a >> value
+            elif opcode == 7:
+                c = a >> value
+            else:
+                raise ValueError("Combo operand cannot be 7")
+            ip += 2
+        return output
+
+    def run_batch(
+        self, a_values, b_values=0, c_values=0, max_outputs: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Run the program over arrays of registers, one lane per triple, returning
+        the outputs packed VALUES_PER_WORD per uint64 word and their counts.
+        """
+        if max_outputs is None:
+            max_outputs = len(self.program)
+        a = np.array(a_values, dtype=np.uint64).ravel()
+        nb_lanes = a.size
+        b = np.broadcast_to(np.asarray(b_values, dtype=np.uint64), nb_lanes).copy()
+        c = np.broadcast_to(np.asarray(c_values, dtype=np.uint64), nb_lanes).copy()
+        instructions = self.instructions
+        nb_words = -(-max_outputs // VALUES_PER_WORD)
+        outputs = np.zeros((nb_lanes, nb_words), dtype=np.uint64)
+        counts = np.zeros(nb_lanes, dtype=np.int32)
+        # Running lanes only, compacted
+        lane_ids = np.arange(
+            nb_lanes if instructions and max_outputs > 0 else 0, dtype=np.int64
+        )
+        ip = np.zeros(lane_ids.size, dtype=np.int32)
+        lane_counts = np.zeros(lane_ids.size, dtype=np.int32)
+        while lane_ids.size:
+            if ip.min() == ip.max():
+                # Lanes usually run in lockstep, and whole arrays avoid indexing
+                groups = [(ip[0], slice(None))]
+            else:
+                groups = [
+                    (pointer, np.flatnonzero(ip == pointer))
+                    for pointer in np.unique(ip)
+                ]
+            for pointer, lanes in groups:
+                opcode, value, source = instructions[pointer]
+                if opcode == INVALID_OPCODE:
+                    raise ValueError("Combo operand cannot be 7")
+                if opcode == 3:
+                    ip[lanes] = np.where(
+                        a[lanes] != 0, np.int32(value), np.int32(pointer + 2)
+                    )
+                    continue
+                value = (a, b, c)[source - 1][lanes] if source else np.uint64(value)
+                if opcode == 1:
+                    b[lanes] ^= value
+                elif opcode == 2:
+                    b[lanes] = value & np.uint64(7)
+                elif opcode == 4:
+                    b[lanes] ^= c[lanes]
+                elif opcode == 5:
+                    write_packed_outputs(
+                        outputs, lane_ids[lanes], lane_counts[lanes], value
+                    )
+                    lane_counts[lanes] += 1
+                else:
+                    target = {0: a, 6: b, 7: c}[opcode]
+                    target[lanes] = shift_right(a[lanes], value)
+                ip[lanes] = pointer + 2
+            finished = (ip >= len(instructions)) | (lane_counts >= max_outputs)
+            if finished.any():
+                counts[lane_ids[finished]] = lane_counts[finished]
+                running = ~finished
+                # One array at a time, so that only one extra copy is alive
+                lane_ids = lane_ids[running]
+                ip = ip[running]
+                lane_counts = lane_counts[running]
+                a = a[running]
+                b = b[running]
+                c = c[running]
+        return outputs, counts
+
+
+def write_packed_outputs(
+    outputs: np.ndarray, rows: np.ndarray, counts: np.ndarray, values
+):
+    """Append the low 3 bits of `values` to the packed outputs of the rows."""
+    output_values = values & np.uint64(7)
+    if counts.min() == counts.max():
+        # Lanes in lockstep all write the same slot
+        words, slot = divmod(int(counts[0]), VALUES_PER_WORD)
+        output_values <<= np.uint64(3 * slot)
+    else:
+        words, slots = np.divmod(counts, VALUES_PER_WORD)
+        output_values <<= (3 * slots).astype(np.uint64)
+    outputs[rows, words] |= output_values
+
+
+def pack_outputs(values: List[int]) -> np.ndarray:
+    """Pack 3-bit values the way `Computer.run_batch` packs the outputs of a lane."""
+    words = np.zeros(-(-len(values) // VALUES_PER_WORD), dtype=np.uint64)
+    for idx, value in enumerate(values):
+        word, slot = divmod(idx, VALUES_PER_WORD)
+        words[word] |= np.uint64(value << (3 * slot))
+    return words
+
+
+def unpack_outputs(words: np.ndarray, count: int) -> List[int]:
+    return [
+        (int(words[idx // VALUES_PER_WORD]) >> (3 * (idx % VALUES_PER_WORD))) & 7
+        for idx in range(count)
+    ]
+
+
+def shift_right(values: np.ndarray, shifts) -> np.ndarray:
+    if np.ndim(shifts) == 0:
+        # Literal shifts are below 4
+        return values >> shifts
+    # NumPy only keeps the low bits of shifts of 64 bits or more, which must
+    # give 0 as the divisions they stand for
+    shifted_values = values >> np.minimum(shifts, np.uint64(63))
+    shifted_values[shifts >= 64] = 0
+    return shifted_values
 
 
 def solve_level1(filename: str):
-    lines = read_input_lines(filename)
-    register_input, program_input = split_input_lines(lines)
-    register = {
-        letter: int(line.split(": ")[1]) for letter, line in zip("ABC", register_input)
-    }
-    program_opcodes = [int(val) for val in program_input[0].split(": ")[1].split(",")]
-    output = run_program(register, program_opcodes)
+    registers, program = read_computer_input(filename)
+    output = Computer(program).run(*registers)
     return ",".join(map(str, output))
 
 
-def run_program(register, program_opcodes):
-    instruction_idx = 0
-    output = list()
-    while True:
-        if instruction_idx >= len(program_opcodes):
-            break
-        opcode, operand = list(zip(program_opcodes[:-1], program_opcodes[1:]))[
-            instruction_idx
-        ]
-        instruction = Instruction(opcode, operand, register)
-        instruction.run(output)
-        instruction_idx = (
-            instruction.instruction_pointer
-            if instruction.instruction_pointer is not None
-            else instruction_idx + 2
-        )
-
-    return output
-
-
 ## Implementation of PART 2
 
-
-def search_input_a_value(register, program_opcodes, min_value=None, current_idx=None):
-
-    min_value = min_value if min_value else 8 ** (len(program_opcodes) - 1)
-    new_min_value = None
-
-    for idx, target_value in enumerate(program_opcodes[::-1]):
-
-        idx = len(program_opcodes) - idx - 1
-
-        if current_idx:
-            if idx >= current_idx:
-                continue
-
-        for j in range(9):
-            min_value = new_min_value if new_min_value else min_value
-            initial_register_value = min_value + 8 ** (idx) * j
-
-            register["A"] = initial_register_value
-            output = run_program(register, program_opcodes)
-
-            if "".join(map(str, output)) == "".join(map(str, program_opcodes)):
-                return initial_register_value
-
-            if output[idx] == target_value:
-
-                new_min_value = search_input_a_value(
-                    register, program_opcodes, initial_register_value, idx
-                )
-                if not new_min_value:
-                    continue
-
-                else:
-                    return new_min_value
-        if j > 7:
-            return
+def get_loop_body(program: List[int]) -> Computer:
+    """Single iteration of a loop that ends with `jnz 0`, shifts A by 3 bits
+    once, outputs one value and sets B and C before reading them.
+    """
+    if len(program) % 2 or program[-2:] != [3, 0]:
+        raise ValueError("The program should end with the only jump, to 0")
+    body = list(zip(program[:-2:2], program[1:-2:2]))
+    opcodes = [opcode for opcode, _ in body]
+    if 3 in opcodes or body.count((0, 3)) != 1 or opcodes.count(0) != 1:
+        raise ValueError("The loop should shift A by 3 bits exactly once")
+    if opcodes.count(5) != 1:
+        raise ValueError("The loop should output exactly one value")
+    written_registers = set()
+    for opcode, operand in body:
+        read_registers = set()
+        if opcode in (1, 4):
+            read_registers.add("B")
+        if opcode == 4:
+            read_registers.add("C")
+        if opcode not in (1, 4) and operand in (5, 6):
+            read_registers.add("BC"[operand - 5])
+        if read_registers - written_registers:
+            raise ValueError("The loop should set B and C before reading them")
+        if opcode in (1, 2, 4, 6):
+            written_registers.add("B")
+        elif opcode == 7:
+            written_registers.add("C")
+    return Computer(program[:-2])
+
+
+def search_input_a_value(program: List[int]) -> Optional[int]:
+    """Smallest A making the program output itself, built 3 bits at a time
+    from the last output backwards.
+    """
+    loop_body = get_loop_body(program)
+
+    def search(a_prefix: int, position: int) -> Optional[int]:
+        if position < 0:
+            return a_prefix
+        for digit in range(8):
+            a = a_prefix << 3 | digit
+            # Only the first iteration can start with A = 0
+            if (a or position == 0) and loop_body.run(a) == [program[position]]:
+                solution = search(a, position - 1)
+                if solution is not None:
+                    return solution
+        return None
+
+    return search(0, len(program) - 1)
+
+
+def find_input_a_values(program: List[int]) -> List[int]:
+    """All the values of A making the program output itself, in increasing order."""
+    loop_body = get_loop_body(program)
+    candidates = [0]
+    for position in range(len(program) - 1, -1, -1):
+        candidates = [
+            a
+            for a_prefix in candidates
+            for a in range(a_prefix << 3, (a_prefix << 3) + 8)
+            if (a or position == 0) and loop_body.run(a) == [program[position]]
+        ]
+    return candidates
 
 
 def solve_level2(filename: str):
-    lines = read_input_lines(filename)
-    register_input, program_input = split_input_lines(lines)
-    register = {
-        letter: int(line.split(": ")[1]) for letter, line in zip("ABC", register_input)
-    }
-    program_opcodes = [int(val) for val in program_input[0].split(": ")[1].split(",")]
-    return search_input_a_value(register, program_opcodes)
+    _, program = read_computer_input(filename)
+    return search_input_a_value(program)
 
 
 if __name__ == "__main__":
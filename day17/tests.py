@@ -1,5 +1,21 @@
 import os
-from code_logic import solve_level1, solve_level2
+import pytest
+
+from code_logic import (
+    INVALID_OPCODE,
+    LITERAL,
+    REGISTER_A,
+    REGISTER_B,
+    Computer,
+    decode_program,
+    find_input_a_values,
+    pack_outputs,
+    read_computer_input,
+    search_input_a_value,
+    solve_level1,
+    solve_level2,
+    unpack_outputs,
+)
 
 current_directory = os.path.dirname(__file__)
 
@@ -14,3 +30,69 @@ class TestAdventOfCode:
 
     def test_part2_input(self):
         assert solve_level2(f"{current_directory}/input2.txt") == 190593310997519
+
+    def test_computer_examples(self):
+        assert Computer([5, 0, 5, 1, 5, 4]).run(10) == [0, 1, 2]
+        assert Computer([0, 1, 5, 4, 3, 0]).run(2024) == [
+            4, 2, 5, 6, 7, 7, 7, 7, 3, 1, 0
+        ]
+        assert Computer([1, 7, 5, 5]).run(0, 29) == [2]
+        assert Computer([4, 0, 5, 5]).run(0, 2024, 43690) == [2]
+
+    def test_decoded_operands(self):
+        assert decode_program([2, 4, 1, 7, 5, 7]) == [
+            (2, 0, REGISTER_A),
+            (4, 1, LITERAL),
+            (1, 7, LITERAL),
+            (7, 0, REGISTER_B),
+            (INVALID_OPCODE, 7, LITERAL),
+        ]
+
+    def test_computer_large_register(self):
+        program = [0, 3, 5, 4, 3, 0]
+        assert Computer(program).run(5 * 8**25 + 3) == [0] * 24 + [5, 0]
+        with pytest.raises(ValueError):
+            Computer([5, 7]).run(1)
+
+    def test_part2_example(self):
+        assert search_input_a_value([0, 3, 5, 4, 3, 0]) == 117440
+
+    def test_part2_all_solutions(self):
+        _, program = read_computer_input(f"{current_directory}/input2.txt")
+        solutions = find_input_a_values(program)
+        assert solutions[0] == 190593310997519
+        assert all(Computer(program).run(a) == program for a in solutions)
+
+    def test_part2_rejects_unsupported_programs(self):
+        _, program = read_computer_input(f"{current_directory}/sample1.txt")
+        with pytest.raises(ValueError):
+            search_input_a_value(program)
+
+    def test_batch_matches_single_runs(self):
+        _, program = read_computer_input(f"{current_directory}/input1.txt")
+        computer = Computer(program)
+        a_values = [0, 1, 7, 8, 41644071, 190593310997519, 2**63 + 5]
+        outputs, counts = computer.run_batch(a_values, max_outputs=40)
+        for a, lane_outputs, count in zip(a_values, outputs, counts):
+            assert unpack_outputs(lane_outputs, count) == computer.run(a)
+
+    def test_batch_diverging_lanes_and_large_shifts(self):
+        # Lanes leave the loop after different numbers of iterations
+        computer = Computer([0, 1, 5, 4, 3, 0])
+        outputs, counts = computer.run_batch(range(3000), max_outputs=8)
+        for a in range(3000):
+            assert unpack_outputs(outputs[a], counts[a]) == computer.run(a)[:8]
+        # Shifting by B ^ 7 = 71 bits empties C
+        computer = Computer([1, 7, 7, 5, 5, 6])
+        a = 2**63 + 2**8 + 5
+        outputs, counts = computer.run_batch([a], b_values=[64])
+        assert unpack_outputs(outputs[0], counts[0]) == computer.run(a, 64) == [0]
+
+    def test_batch_packed_quines(self):
+        _, program = read_computer_input(f"{current_directory}/input2.txt")
+        solutions = find_input_a_values(program)
+        outputs, counts = Computer(program).run_batch(solutions + [solutions[0] - 1])
+        is_quine = (outputs == pack_outputs(program)).all(axis=1) & (
+            counts == len(program)
+        )
+        assert is_quine.tolist() == [True] * len(solutions) + [False]
@@ -1,130 +1,82 @@
-from collections import Counter
-from itertools import product
 import os.path
-from random import randint
-from typing import List, Tuple
 import dotenv
+import numpy as np
 
-from utils.utils import get_input_if_not_exists, read_input_lines
+from utils.grid import Grid
+from utils.utils import get_input_if_not_exists
 
 dotenv.load_dotenv()
 
 
 ## Implementation of PART 1
 
+DIRECTIONS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)]
 
-def _verify_direction(list_of_coordinates: List[Tuple[int, ...]]):
-    if len(list_of_coordinates) < 2:
-        return True
-    if len(set(x for x, _ in list_of_coordinates)) == 1:
-        # All x are the same == horizontal direction
-        return True
-    if len(set(y for _, y in list_of_coordinates)) == 1:
-        # All y are the same == vertical direction
-        return True
-    if len(set(x - y for x, y in list_of_coordinates)) == 1:
-        # All x-y are the same == standard diagonal direction
-        return True
-    if len(set(x + y for x, y in list_of_coordinates)) == 1:
-        # All x+y are the same == reverse diagonal direction
-        return True
-    return False
-
-
-def recursive_expansive_search(
-    grid: List[List[str]],
-    x: int,
-    y: int,
-    letters_cumulated: str = "",
-    coordinates_cumulated: List[Tuple[int]] = list(),
-):
-    if letters_cumulated not in "XMAS":
-        return 0
 
-    if letters_cumulated == "XMAS":
-        return 1
-
-    coordinates_to_inspect = [
-        (new_x, new_y)
-        for new_x, new_y in product(range(x - 1, x + 2), range(y - 1, y + 2))
-        if all(
-            [
-                new_x >= 0 and new_y >= 0,
-                (new_x, new_y) != (x, y),
-                new_x < len(grid[0]) and new_y < len(grid),
-                _verify_direction(coordinates_cumulated + [(new_x, new_y)]),
-            ]
-        )
-    ]
-
-    return sum(
-        recursive_expansive_search(
-            grid,
-            new_x,
-            new_y,
-            letters_cumulated + grid[new_x][new_y],
-            coordinates_cumulated + [(new_x, new_y)],
-        )
-        for new_x, new_y in coordinates_to_inspect
-    )
+def _word_codes(word: str) -> np.ndarray:
+    return np.frombuffer(word.encode("ascii"), dtype=np.uint8)
 
 
-def solve_level1(filename: str):
-    lines = read_input_lines(filename)
+def count_word_in_direction(array: np.ndarray, word: str, dx: int, dy: int) -> int:
+    height, width = array.shape
+    span_x, span_y = (len(word) - 1) * abs(dx), (len(word) - 1) * abs(dy)
+    if span_x >= width or span_y >= height:
+        return 0
+    # Each letter of the word is compared against the whole grid shifted by its
+    # offset, so every starting cell is tested at once
+    matches = np.ones((height - span_y, width - span_x), dtype=bool)
+    for offset, code in enumerate(_word_codes(word)):
+        x0 = offset * dx + (span_x if dx < 0 else 0)
+        y0 = offset * dy + (span_y if dy < 0 else 0)
+        matches &= array[y0 : y0 + height - span_y, x0 : x0 + width - span_x] == code
+    return int(matches.sum())
 
-    # Find all occurences of X
-    initial_X_coords = [
-        (row, col)
-        for row, line in enumerate(lines)
-        for col, char in enumerate(line)
-        if char == "X"
-    ]
 
-    return sum(
-        recursive_expansive_search(lines, x, y, "X", [(x, y)])
-        for x, y in initial_X_coords
-    )
+def count_word_occurrences(array: np.ndarray, word: str) -> int:
+    return sum(count_word_in_direction(array, word, dx, dy) for dx, dy in DIRECTIONS)
 
 
-## Implementation of PART 2
+def solve_level1(filename: str):
+    with Grid.from_file(filename) as grid:
+        return count_word_occurrences(grid.to_array(), "XMAS")
 
 
-def verify_crossed_MAS(grid, x, y):
-    coordinates_to_inspect = [
-        (new_x, new_y)
-        for new_x, new_y in product(range(x - 1, x + 2), range(y - 1, y + 2))
-        if all(
-            [
-                new_x >= 0 and new_y >= 0,
-                new_x != x,
-                new_y != y,
-                new_x < len(grid[0]) and new_y < len(grid),
-            ]
-        )
-    ]
-    if len(coordinates_to_inspect) < 4:
-        return 0
-    letters = [grid[new_x][new_y] for new_x, new_y in coordinates_to_inspect]
+## Implementation of PART 2
 
-    if Counter(letters) != Counter("MMSS"):
-        return 0
-    if grid[x - 1][y - 1] == grid[x + 1][y + 1]:
+
+def _diagonal_matches(array: np.ndarray, word: str, anti: bool) -> np.ndarray:
+    # Matches of the word, read in either direction, along the diagonal
+    # centered on each cell that is at least `radius` cells away from the borders
+    height, width = array.shape
+    radius = len(word) // 2
+    codes = _word_codes(word)
+    forward = np.ones((height - 2 * radius, width - 2 * radius), dtype=bool)
+    backward = forward.copy()
+    for offset in range(-radius, radius + 1):
+        dx = -offset if anti else offset
+        shifted = array[
+            radius + offset : height - radius + offset,
+            radius + dx : width - radius + dx,
+        ]
+        forward &= shifted == codes[radius + offset]
+        backward &= shifted == codes[radius - offset]
+    return forward | backward
+
+
+def count_crossed_word(array: np.ndarray, word: str) -> int:
+    if len(word) % 2 == 0:
+        raise ValueError("Crossed words need an odd length to share their center")
+    height, width = array.shape
+    if len(word) > min(height, width):
         return 0
-    return 1
+    crosses = _diagonal_matches(array, word, anti=False)
+    crosses &= _diagonal_matches(array, word, anti=True)
+    return int(crosses.sum())
 
 
 def solve_level2(filename: str):
-    lines = read_input_lines(filename)
-
-    # Find all occurences of X
-    initial_A_coords = [
-        (row, col)
-        for row, line in enumerate(lines)
-        for col, char in enumerate(line)
-        if char == "A"
-    ]
-    result = sum(verify_crossed_MAS(lines, x, y) for x, y in initial_A_coords)
-    return result
+    with Grid.from_file(filename) as grid:
+        return count_crossed_word(grid.to_array(), "MAS")
 
 
 if __name__ == "__main__":
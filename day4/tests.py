@@ -1,4 +1,10 @@
-from code_logic import solve_level1, solve_level2
+from code_logic import (
+    count_crossed_word,
+    count_word_occurrences,
+    solve_level1,
+    solve_level2,
+)
+from utils.grid import Grid
 
 
 class TestAdventOfCode:
@@ -14,3 +20,11 @@ class TestAdventOfCode:
 
     def test_part2_input(self):
         assert solve_level2("day4/input2.txt") == 1982
+
+    def test_other_words(self):
+        array = Grid.from_lines(["CATS", "AAXT", "TOTS"]).to_array()
+        assert count_word_occurrences(array, "CAT") == 3
+        assert count_word_occurrences(array, "TAC") == 3
+        assert count_crossed_word(array, "TAT") == 0
+        crossed_array = Grid.from_lines(["TXT", "XAX", "TOT"]).to_array()
+        assert count_crossed_word(crossed_array, "TAT") == 1
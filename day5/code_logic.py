@@ -1,11 +1,11 @@
 from collections import defaultdict
-from more_itertools import circular_shifts
+from functools import cmp_to_key
 import math
 import os.path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, Iterable, List, Set
 import dotenv
 
-from utils.utils import get_input_if_not_exists, read_input_lines
+from utils.utils import get_input_if_not_exists, iter_input_sections
 
 dotenv.load_dotenv()
 
@@ -13,14 +13,8 @@ dotenv.load_dotenv()
 ## Implementation of PART 1
 
 
-def split_input(lines: List[str]) -> Tuple[List[str], List[str]]:
-    split_idx = [idx for idx, line in enumerate(lines) if len(line) == 0]
-    return lines[: split_idx[0]], lines[split_idx[0] + 1 :]
-
-
 def get_input_and_rules_dicts(filename):
-    lines = read_input_lines(filename)
-    rules, input = split_input(lines)
+    rules, input = iter_input_sections(filename)
     input_formatted = [list(map(int, line.split(","))) for line in input]
     rules_dict = create_rules_dict(rules)
     return input_formatted, rules_dict
@@ -34,25 +28,62 @@ def create_rules_dict(rules: List[str]) -> Dict[int, Set[int]]:
     return succeeding_rules_dict
 
 
-def validate_printing_order(
-    rules_dict: Dict[int, Set[int]],
-    printing_order: List[str],
-) -> List[bool]:
-    validity_list = list()
-    for idx, item in enumerate(printing_order):
-        if any([succ not in rules_dict[item] for succ in printing_order[idx + 1 :]]):
-            validity_list.append(False)
-            continue
-        validity_list.append(True)
-    return validity_list
+class RulesIndex:
+    """Page ordering rules encoded as bitsets.
+
+    Each page gets its own bit, and each page maps to the mask of the pages
+    that must be printed after it, so checking a page against every page
+    already printed is a single AND.
+    """
+
+    def __init__(self, rules_dict: Dict[int, Set[int]]):
+        pages = sorted(set(rules_dict).union(*rules_dict.values()))
+        self.page_bits = {page: 1 << idx for idx, page in enumerate(pages)}
+        self.successors_masks = {
+            page: sum(self.page_bits[succ] for succ in successors)
+            for page, successors in rules_dict.items()
+        }
+        self.sort_key = cmp_to_key(self.compare_pages)
+
+    def compare_pages(self, page1: int, page2: int) -> int:
+        if self.successors_masks.get(page1, 0) & self.page_bits.get(page2, 0):
+            return -1
+        if self.successors_masks.get(page2, 0) & self.page_bits.get(page1, 0):
+            return 1
+        return 0
+
+    def is_valid_order(self, printing_order: List[int]) -> bool:
+        printed_mask = 0
+        for page in printing_order:
+            if self.successors_masks.get(page, 0) & printed_mask:
+                return False
+            printed_mask |= self.page_bits.get(page, 0)
+        return True
+
+    def fix_order(self, printing_order: List[int]) -> List[int]:
+        # We assume the set of rules is complete for the pages of each order,
+        # so the rules define a total order that can be used as a comparator
+        return sorted(printing_order, key=self.sort_key)
+
+    def validate_orders(self, printing_orders: Iterable[List[int]]) -> List[bool]:
+        return [self.is_valid_order(order) for order in printing_orders]
+
+    def fix_orders(self, printing_orders: Iterable[List[int]]) -> List[List[int]]:
+        return [
+            order if self.is_valid_order(order) else self.fix_order(order)
+            for order in printing_orders
+        ]
 
 
 def solve_level1(filename: str):
     input_formatted, rules_dict = get_input_and_rules_dicts(filename)
+    rules_index = RulesIndex(rules_dict)
     valid_orders = [
         order
-        for order in input_formatted
-        if all(validate_printing_order(rules_dict, order))
+        for order, is_valid in zip(
+            input_formatted, rules_index.validate_orders(input_formatted)
+        )
+        if is_valid
     ]
     return calculate_middle_item_sum(valid_orders)
 
@@ -64,30 +95,17 @@ def calculate_middle_item_sum(valid_orders):
 ## Implementation of PART 2
 
 
-def fix_sequence(invalid_sequence: List[int], rules_dict):
-
-    valid_list = list()
-    # Rotate and get the first element of the sublist when found valid. We assume the set of rules is complete
-    # and that there is only one valid shift even if we do not verify the already validated elements
-    while len(invalid_sequence) > 0:
-        valid_shift = [
-            list(shift)
-            for shift in circular_shifts(invalid_sequence, -1)
-            if validate_printing_order(rules_dict, shift)[0]
-        ][0]
-        valid_list.append(valid_shift.pop(0))
-        invalid_sequence = valid_shift
-    return valid_list
-
-
 def solve_level2(filename: str):
     input_formatted, rules_dict = get_input_and_rules_dicts(filename)
+    rules_index = RulesIndex(rules_dict)
     invalid_orders = [
         order
-        for order in input_formatted
-        if not all(validate_printing_order(rules_dict, order))
+        for order, is_valid in zip(
+            input_formatted, rules_index.validate_orders(input_formatted)
+        )
+        if not is_valid
     ]
-    fixed_sequences = [fix_sequence(seq, rules_dict) for seq in invalid_orders]
+    fixed_sequences = rules_index.fix_orders(invalid_orders)
     return calculate_middle_item_sum(fixed_sequences)
 
 
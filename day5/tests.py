@@ -1,5 +1,10 @@
 import os
-from code_logic import solve_level1, solve_level2
+from code_logic import (
+    RulesIndex,
+    get_input_and_rules_dicts,
+    solve_level1,
+    solve_level2,
+)
 
 current_directory = os.path.dirname(__file__)
 
@@ -17,3 +22,15 @@ class TestAdventOfCode:
 
     def test_part2_input(self):
         assert solve_level2(f"{current_directory}/input2.txt") == 4121
+
+    def test_rules_index_batch(self):
+        orders, rules_dict = get_input_and_rules_dicts(
+            f"{current_directory}/sample1.txt"
+        )
+        rules_index = RulesIndex(rules_dict)
+        assert rules_index.validate_orders(orders) == [True] * 3 + [False] * 3
+        assert rules_index.fix_orders(orders[3:]) == [
+            [97, 75, 47, 61, 53],
+            [61, 29, 13],
+            [97, 75, 47, 29, 13],
+        ]
@@ -1,144 +1,190 @@
-import os.path
-from typing import List, OrderedDict, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import os
+from typing import Dict, List, Optional, Tuple
 import dotenv
 
-from utils.utils import get_input_if_not_exists, read_input_lines
+from utils.grid import Grid
+from utils.utils import get_input_if_not_exists
 
 dotenv.load_dotenv()
 
 
 ## Implementation of PART 1
-class Directions:
-    dir_dict = OrderedDict(
-        [
-            ("^", (0, -1)),
-            (">", (1, 0)),
-            ("v", (0, 1)),
-            ("<", (-1, 0)),
-        ]
-    )
-    dir_symbols_list = list(dir_dict.keys())
-
-    def __init__(self, first_dir_symbol: str):
-        self.current_dir_symbol = first_dir_symbol
-        self.current_dir_tuple = self.dir_dict[first_dir_symbol]
-
-    def turn_right(self):
-        idx = self.dir_symbols_list.index(self.current_dir_symbol)
-        self.current_dir_symbol = self.dir_symbols_list[
-            (idx + 1) % len(self.dir_symbols_list)
-        ]
-        self.current_dir_tuple = self.dir_dict[self.current_dir_symbol]
-
-    def forward_position(self, position_tuple: Tuple[int, int]) -> Tuple[int, int]:
-        x, y = position_tuple
-        dx, dy = self.current_dir_tuple
-        return (x + dx, y + dy)
-
-    def backward_position(self, position_tuple: Tuple[int, int]) -> Tuple[int, int]:
-        x, y = position_tuple
-        dx, dy = self.current_dir_tuple
-        return (x - dx, y - dy)
-
-
-def get_obstacles_coords(lines: List[str]) -> List[Tuple[int, int]]:
-    obstacles = []
-    for y, line in enumerate(lines):
-        for x, char in enumerate(line):
-            if char == "#":
-                obstacles.append((x, y))
-    return obstacles
-
-
-def get_initial_coords_and_symbol(lines: List[str]) -> Tuple[Tuple[int, int], str]:
-    field_symbolds = {".", "#"}
-    for y, line in enumerate(lines):
-        for x, char in enumerate(line):
-            if char not in field_symbolds:
-                return (x, y), char
-    return None
-
-
-def get_guard_path(
-    guard_coords: Tuple[int, int],
-    obstacle_coords: List[Tuple[int, int]],
-    guard_symbol: str,
-    grid_dimensions: Tuple[int, int],
-) -> List[Tuple[int, int]]:
-    obstacle_set = set(obstacle_coords)
-    max_x, max_y = grid_dimensions
-    guard_path = list()
-    directions = Directions(guard_symbol)
-    x, y = guard_coords
-    while x < max_x and x >= 0 and y < max_y and y >= 0:
-        x, y = directions.forward_position((x, y))
-        if (x, y) in obstacle_set:
-            x, y = directions.backward_position((x, y))
-            directions.turn_right()
-        else:
-            guard_path.append((x, y))
-    return set(guard_path[:-1])
 
+# Clockwise order, so turning right is moving to the next direction
+DIRECTION_SYMBOLS = "^>v<"
+DIRECTION_OFFSETS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+EXIT = -1
+
+
+class GuardSimulator:
+    """Guard walk over a flat copy of the lab, with precomputed jump tables.
+
+    Cells are numbered `y * width + x`. For each direction, the jump table
+    holds for every cell the last cell reached before bumping into an obstacle
+    when walking straight from it, or EXIT when the guard leaves the lab.
+    """
+
+    def __init__(self, grid: Grid):
+        self.width, self.height = grid.width, grid.height
+        self.obstacles = bytearray(self.width * self.height)
+        for x, y in grid.find_all("#"):
+            self.obstacles[y * self.width + x] = 1
+        for direction, symbol in enumerate(DIRECTION_SYMBOLS):
+            start_coords = grid.find(symbol)
+            if start_coords is not None:
+                self.start_cell = start_coords[1] * self.width + start_coords[0]
+                self.start_direction = direction
+                break
+        self.jump_tables = self._build_jump_tables()
+
+    @classmethod
+    def from_file(cls, filename: str):
+        with Grid.from_file(filename) as grid:
+            return cls(grid)
+
+    def _build_jump_tables(self) -> List[List[int]]:
+        width, height = self.width, self.height
+        jump_tables = [[EXIT] * (width * height) for _ in DIRECTION_OFFSETS]
+        up, right, down, left = jump_tables
+        for y in range(height):
+            row_start = y * width
+            stop = EXIT
+            for cell in range(row_start, row_start + width):
+                if self.obstacles[cell]:
+                    stop = cell + 1
+                left[cell] = stop
+            stop = EXIT
+            for cell in range(row_start + width - 1, row_start - 1, -1):
+                if self.obstacles[cell]:
+                    stop = cell - 1
+                right[cell] = stop
+        for x in range(width):
+            stop = EXIT
+            for cell in range(x, width * height, width):
+                if self.obstacles[cell]:
+                    stop = cell + width
+                up[cell] = stop
+            stop = EXIT
+            for cell in range(x + (height - 1) * width, -1, -width):
+                if self.obstacles[cell]:
+                    stop = cell - width
+                down[cell] = stop
+        return jump_tables
+
+    def walk_path(self) -> Dict[int, Tuple[int, int]]:
+        """Map every visited cell to the guard state right before first entering it.
+
+        The state is the (cell, direction) pair the guard is in one step before
+        reaching the cell, the start cell being mapped to its own initial state.
+        """
+        cell, direction = self.start_cell, self.start_direction
+        first_entering_states = {cell: (cell, direction)}
+        x, y = cell % self.width, cell // self.width
+        while True:
+            dx, dy = DIRECTION_OFFSETS[direction]
+            new_x, new_y = x + dx, y + dy
+            if not (0 <= new_x < self.width and 0 <= new_y < self.height):
+                return first_entering_states
+            new_cell = new_y * self.width + new_x
+            if self.obstacles[new_cell]:
+                direction = (direction + 1) % 4
+                continue
+            if new_cell not in first_entering_states:
+                first_entering_states[new_cell] = (cell, direction)
+            cell, x, y = new_cell, new_x, new_y
+
+    def _jump(self, cell: int, direction: int, extra_obstacle: int) -> int:
+        stop = self.jump_tables[direction][cell]
+        width = self.width
+        if direction in (1, 3):
+            if extra_obstacle // width != cell // width:
+                return stop
+            if direction == 1 and cell < extra_obstacle and (
+                stop == EXIT or extra_obstacle <= stop
+            ):
+                return extra_obstacle - 1
+            if direction == 3 and extra_obstacle < cell and (
+                stop == EXIT or stop <= extra_obstacle
+            ):
+                return extra_obstacle + 1
+            return stop
+        if extra_obstacle % width != cell % width:
+            return stop
+        if direction == 2 and cell < extra_obstacle and (
+            stop == EXIT or extra_obstacle <= stop
+        ):
+            return extra_obstacle - width
+        if direction == 0 and extra_obstacle < cell and (
+            stop == EXIT or stop <= extra_obstacle
+        ):
+            return extra_obstacle + width
+        return stop
+
+    def is_loop_with_obstacle(
+        self, extra_obstacle: int, cell: int, direction: int
+    ) -> bool:
+        # The guard only ever stops right before an obstacle, so the walk loops
+        # exactly when one of those stopping states is reached a second time
+        visited_states = set()
+        while True:
+            cell = self._jump(cell, direction, extra_obstacle)
+            if cell == EXIT:
+                return False
+            state = cell * 4 + direction
+            if state in visited_states:
+                return True
+            visited_states.add(state)
+            direction = (direction + 1) % 4
+
+    def count_looping_obstacles(self, candidates: List[Tuple[int, int, int]]) -> int:
+        return sum(
+            self.is_loop_with_obstacle(*candidate_and_state)
+            for candidate_and_state in candidates
+        )
 
-def solve_level1(filename: str):
-    lines = read_input_lines(filename)
-    grid_dimensions = (len(lines[0]), len(lines))
-    obstacle_coords = get_obstacles_coords(lines)
-    guard_coords, guard_symbol = get_initial_coords_and_symbol(lines)
-    guard_path_set = get_guard_path(
-        guard_coords, obstacle_coords, guard_symbol, grid_dimensions
-    )
 
-    return len(guard_path_set)
+def solve_level1(filename: str):
+    simulator = GuardSimulator.from_file(filename)
+    return len(simulator.walk_path())
 
 
 ## Implementation of PART 2
 
+_worker_simulator = None
 
-def get_walk_path_until_exit_or_loop(
-    guard_coords: Tuple[int, int],
-    obstacle_coords: List[Tuple[int, int]],
-    guard_symbol: str,
-    grid_dimensions: Tuple[int, int],
-) -> List[Tuple[int, int]]:
-    obstacle_set = set(obstacle_coords)
-    max_x, max_y = grid_dimensions
-    guard_path = list()
-    directions = Directions(guard_symbol)
-    x, y = guard_coords
-    while x < max_x and x >= 0 and y < max_y and y >= 0:
-        x, y = directions.forward_position((x, y))
-        if (x, y) in obstacle_set:
-            x, y = directions.backward_position((x, y))
-            directions.turn_right()
-        else:
-            guard_path.append((x, y))
-        if len(guard_path) > 10_000:
-            return list()
-    return guard_path
-
-
-def solve_level2(filename: str):
-    lines = read_input_lines(filename)
-    grid_dimensions = (len(lines[0]), len(lines))
-    obstacle_coords = get_obstacles_coords(lines)
-    guard_coords, guard_symbol = get_initial_coords_and_symbol(lines)
-    initial_guard_path = get_guard_path(
-        guard_coords, obstacle_coords, guard_symbol, grid_dimensions
-    )
-    valid_obstacles = set()
-
-    for new_obstacle_coords in initial_guard_path:
-        guard_path_list = get_walk_path_until_exit_or_loop(
-            guard_coords,
-            obstacle_coords + [new_obstacle_coords],
-            guard_symbol,
-            grid_dimensions,
-        )
-        if not guard_path_list:
-            valid_obstacles.add(new_obstacle_coords)
 
-    return len(valid_obstacles.difference({guard_coords}))
+def _init_worker(simulator: GuardSimulator):
+    global _worker_simulator
+    _worker_simulator = simulator
+
+
+def _count_looping_obstacles_in_worker(candidates: List[Tuple[int, int, int]]):
+    return _worker_simulator.count_looping_obstacles(candidates)
+
+
+def solve_level2(filename: str, max_workers: Optional[int] = None):
+    simulator = GuardSimulator.from_file(filename)
+    # Each trial starts right before the guard first walks into the new
+    # obstacle, since the path up to that point is unchanged
+    candidates = [
+        (obstacle_cell, cell, direction)
+        for obstacle_cell, (cell, direction) in simulator.walk_path().items()
+        if obstacle_cell != simulator.start_cell
+    ]
+    if max_workers == 1:
+        return simulator.count_looping_obstacles(candidates)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    chunk_size = max(1, len(candidates) // (4 * max_workers) + 1)
+    chunks = [
+        candidates[idx : idx + chunk_size]
+        for idx in range(0, len(candidates), chunk_size)
+    ]
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker, initargs=(simulator,)
+    ) as executor:
+        return sum(executor.map(_count_looping_obstacles_in_worker, chunks))
 
 
 if __name__ == "__main__":
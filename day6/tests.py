@@ -17,3 +17,6 @@ class TestAdventOfCode:
 
     def test_part2_input(self):
         assert solve_level2(f"{current_directory}/input2.txt") == 1655
+
+    def test_part2_sample_single_process(self):
+        assert solve_level2(f"{current_directory}/sample1.txt", max_workers=1) == 6
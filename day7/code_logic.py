@@ -1,9 +1,8 @@
-from ast import literal_eval
-from itertools import chain, product
-import os.path
-from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import os
+from typing import Callable, List, Optional, Tuple
 import dotenv
-from tqdm import tqdm
 
 from utils.utils import get_input_if_not_exists, read_input_lines
 
@@ -12,10 +11,18 @@ dotenv.load_dotenv()
 
 ## Implementation of PART 1
 
+# Operators are given by their inverse: knowing the result of `x op operand`,
+# they return x, None when no valid x can produce that result, or ANY_RESULT
+# when every x does (as for `x * 0 = 0`). ANY_RESULT is negative, which no
+# value of an equation can be. Equations are checked on a process
+# pool by default, so custom operators must be picklable, module-level functions
+Operator = Callable[[int, int], Optional[int]]
+ANY_RESULT = -1
+
 
 def get_equation_tuples(lines):
     equations_tuple = [
-        (int(result), [fact for fact in factors.split()])
+        (int(result), [int(fact) for fact in factors.split()])
         for line in lines
         for result, factors in [line.split(": ")]
     ]
@@ -23,104 +30,100 @@ def get_equation_tuples(lines):
     return equations_tuple
 
 
-def generate_binary_combinations(n: int) -> Dict[int, List[List[int]]]:
-
-    def _replace_bin_by_operators(seq: List[int]) -> List[str]:
-        return ["*" if bin else "+" for bin in seq]
-
-    binary_list = list(
-        chain.from_iterable(
-            [product([0, 1], repeat=nb_ops) for nb_ops in range(1, n + 1)]
-        )
-    )
-    sum_value_to_combos = {
-        total: [
-            _replace_bin_by_operators(seq) for seq in binary_list if sum(seq) == total
-        ]
-        for total in range(n + 1)
-    }
-    return sum_value_to_combos
-
+def undo_addition(result: int, operand: int) -> Optional[int]:
+    return result - operand if result >= operand else None
 
-def solve_level1(filename: str):
-    lines = read_input_lines(filename)
-    equations_tuple = get_equation_tuples(lines)
-    sum_value_to_combos = generate_binary_combinations(
-        max(len(factors) for _, factors in equations_tuple)
-    )
-    valid_results = [
-        result
-        for result, factors in equations_tuple
-        if validate_equation(factors, result, sum_value_to_combos)
-    ]
 
-    return sum(valid_results)
+def undo_multiplication(result: int, operand: int) -> Optional[int]:
+    if operand == 0:
+        return ANY_RESULT if result == 0 else None
+    if result % operand != 0:
+        return None
+    return result // operand
 
 
-def write_eq_and_eval(factors, operators, result):
-    fact1, remaining_facts = factors[0], factors[1:]
-    for op, fact2 in zip(operators, remaining_facts):
-        fact1 = eval(str(fact1) + op + fact2)
-        if fact1 > result:
-            return -1
-    return fact1
+LEVEL1_OPERATORS: Tuple[Operator, ...] = (undo_multiplication, undo_addition)
 
 
-def validate_equation(factors, result, sum_value_to_combos):
-    for nb_mults in range(len(factors), -1, -1):
-        are_results_still_higher = False
-        for operators in sum_value_to_combos[nb_mults]:
-            if len(operators) != len(factors) - 1:
-                continue
-            eval_result = write_eq_and_eval(factors, operators, result)
-            if eval_result == result:
+def is_equation_solvable(
+    result: int, factors: List[int], operators: Tuple[Operator, ...]
+) -> bool:
+    # Operators are evaluated left to right, so the last operand is the one
+    # applied last: undoing it from the result prunes every operator that could
+    # not have produced it, instead of trying all the combinations forward
+    def _undo_from(result: int, idx: int) -> bool:
+        if idx == 0:
+            return result == factors[0]
+        for undo_operator in operators:
+            previous_result = undo_operator(result, factors[idx])
+            if previous_result == ANY_RESULT:
+                # The first factors can be combined in any way
+                return True
+            if previous_result is not None and _undo_from(previous_result, idx - 1):
                 return True
-            if eval_result > result:
-                are_results_still_higher = True
-        if not are_results_still_higher:
-            continue
-    return False
+        return False
 
+    return _undo_from(result, len(factors) - 1)
 
-## Implementation of PART 2
 
+def _is_equation_tuple_solvable(
+    equation_tuple: Tuple[int, List[int]], operators: Tuple[Operator, ...]
+) -> bool:
+    result, factors = equation_tuple
+    return is_equation_solvable(result, factors, operators)
 
-def generate_binary_combinations_level2(n: int) -> Dict[int, List[List[int]]]:
 
-    binary_list = list(
-        chain.from_iterable(
-            [product(["*", "+", ""], repeat=nb_ops) for nb_ops in range(1, n + 1)]
+def sum_solvable_results(
+    equations_tuple: List[Tuple[int, List[int]]],
+    operators: Tuple[Operator, ...],
+    max_workers: Optional[int] = None,
+) -> int:
+    if max_workers == 1:
+        solvable = map(
+            partial(_is_equation_tuple_solvable, operators=operators), equations_tuple
         )
+    else:
+        max_workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            solvable = list(
+                executor.map(
+                    partial(_is_equation_tuple_solvable, operators=operators),
+                    equations_tuple,
+                    chunksize=max(1, len(equations_tuple) // (4 * max_workers)),
+                )
+            )
+    return sum(
+        result
+        for (result, _), is_solvable in zip(equations_tuple, solvable)
+        if is_solvable
     )
-    len_to_combos = {
-        total: [seq for seq in binary_list if len(seq) == total]
-        for total in range(n + 1)
-    }
-    return len_to_combos
 
 
-def solve_level2(filename: str):
+def solve_level1(filename: str, max_workers: Optional[int] = None):
     lines = read_input_lines(filename)
     equations_tuple = get_equation_tuples(lines)
-    len_to_combos = generate_binary_combinations_level2(
-        max(len(factors) for _, factors in equations_tuple)
-    )
-    valid_results = [
-        result
-        for result, factors in tqdm(equations_tuple)
-        if validate_equation_level2(factors, result, len_to_combos)
-    ]
+    return sum_solvable_results(equations_tuple, LEVEL1_OPERATORS, max_workers)
+
 
-    return sum(valid_results)
+## Implementation of PART 2
+
+
+def undo_concatenation(result: int, operand: int) -> Optional[int]:
+    power_of_ten = 10
+    while power_of_ten <= operand:
+        power_of_ten *= 10
+    if result % power_of_ten != operand:
+        return None
+    return result // power_of_ten
 
 
-def validate_equation_level2(factors, result, sum_value_to_combos):
+LEVEL2_OPERATORS: Tuple[Operator, ...] = LEVEL1_OPERATORS + (undo_concatenation,)
 
-    for operators in sum_value_to_combos[len(factors)]:
-        eval_result = write_eq_and_eval(factors, operators, result)
-        if eval_result == result:
-            return True
-    return False
+
+def solve_level2(filename: str, max_workers: Optional[int] = None):
+    lines = read_input_lines(filename)
+    equations_tuple = get_equation_tuples(lines)
+    return sum_solvable_results(equations_tuple, LEVEL2_OPERATORS, max_workers)
 
 
 if __name__ == "__main__":
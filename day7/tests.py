@@ -1,5 +1,15 @@
+from itertools import product
+from operator import add, mul
 import os
-from code_logic import solve_level1, solve_level2
+import random
+
+from code_logic import (
+    LEVEL1_OPERATORS,
+    LEVEL2_OPERATORS,
+    is_equation_solvable,
+    solve_level1,
+    solve_level2,
+)
 
 current_directory = os.path.dirname(__file__)
 
@@ -17,3 +27,33 @@ class TestAdventOfCode:
 
     def test_part2_input(self):
         assert solve_level2(f"{current_directory}/input2.txt") == 248427118972289
+
+    def test_part2_sample_single_process(self):
+        assert solve_level2(f"{current_directory}/sample1.txt", max_workers=1) == 11387
+
+    def test_long_equations(self):
+        factors = [3, 7] * 12
+        assert is_equation_solvable(21**12, factors, LEVEL1_OPERATORS)
+        assert not is_equation_solvable(21**12 + 1, factors, LEVEL1_OPERATORS)
+        assert is_equation_solvable(int("37" * 12), factors, LEVEL2_OPERATORS)
+
+    def test_multiplication_by_zero(self):
+        assert is_equation_solvable(0, [8, 0], LEVEL1_OPERATORS)
+        assert is_equation_solvable(5, [3, 6, 0, 5], LEVEL1_OPERATORS)
+        assert is_equation_solvable(121, [12, 0, 11, 11], LEVEL1_OPERATORS)
+        assert not is_equation_solvable(1, [8, 0], LEVEL1_OPERATORS)
+
+    def test_matches_brute_force(self):
+        random_generator = random.Random(7)
+        for _ in range(500):
+            factors = [random_generator.randint(0, 4) for _ in range(4)]
+            results = set()
+            for operators in product((add, mul), repeat=len(factors) - 1):
+                result = factors[0]
+                for operator, factor in zip(operators, factors[1:]):
+                    result = operator(result, factor)
+                results.add(result)
+            for result in range(30):
+                assert is_equation_solvable(result, factors, LEVEL1_OPERATORS) == (
+                    result in results
+                )
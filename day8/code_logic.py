@@ -1,6 +1,7 @@
+import math
 import os.path
 from collections import defaultdict
-from itertools import chain, combinations, product
+from itertools import combinations
 from typing import Dict, List, Tuple
 
 import dotenv
@@ -17,7 +18,8 @@ class AntennasGrid:
         self.antennas_positions_map = antennas_positions_map
         self.max_x = max_x
         self.max_y = max_y
-        self.frequency_antinodes_map = defaultdict(list)
+        # One byte per grid cell, set when the cell holds an antinode
+        self.antinodes_bitmap = bytearray(max_x * max_y)
 
     @classmethod
     def from_input_lines(cls, lines: List[str]):
@@ -31,38 +33,32 @@ class AntennasGrid:
         max_y = len(lines)
         return cls(max_x, max_y, antennas_position_map)
 
-    def get_antinodes_for_antennas_pair(
-        self, antenna1: Tuple[int, int], antenna2: Tuple[int, int]
-    ) -> List[Tuple[int, int]]:
+    def mark_antinode(self, x: int, y: int):
+        if 0 <= x < self.max_x and 0 <= y < self.max_y:
+            self.antinodes_bitmap[y * self.max_x + x] = 1
+
+    def mark_antinodes_for_antennas_pair(self, antenna1: Tuple[int, int], antenna2: Tuple[int, int]):
         antenna_dist_x = antenna2[0] - antenna1[0]
         antenna_dist_y = antenna2[1] - antenna1[1]
-        antinode1 = antenna2[0] + antenna_dist_x, antenna2[1] + antenna_dist_y
-        antinode2 = antenna1[0] - antenna_dist_x, antenna1[1] - antenna_dist_y
-        return [antinode1, antinode2]
+        self.mark_antinode(antenna2[0] + antenna_dist_x, antenna2[1] + antenna_dist_y)
+        self.mark_antinode(antenna1[0] - antenna_dist_x, antenna1[1] - antenna_dist_y)
 
-    def add_antinodes_for_frequency(self, antenna_id: str, antenna_list: List[Tuple[int, int]]):
+    def add_antinodes_for_frequency(self, antenna_list: List[Tuple[int, int]]):
         for antenna_pair in combinations(antenna_list, r=2):
-            self.frequency_antinodes_map[antenna_id].extend(self.get_antinodes_for_antennas_pair(*antenna_pair))
+            self.mark_antinodes_for_antennas_pair(*antenna_pair)
 
     def add_antinodes_for_all_frequencies(self):
-        for antenna_id, antenna_list in self.antennas_positions_map.items():
-            self.add_antinodes_for_frequency(antenna_id, antenna_list)
-
-    def filter_antinodes_by_max_dims(self):
-        self.frequency_antinodes_map = {
-            k: [antinode for antinode in v if 0 <= antinode[0] < self.max_x and 0 <= antinode[1] < self.max_y]
-            for k, v in self.frequency_antinodes_map.items()
-        }
+        for antenna_list in self.antennas_positions_map.values():
+            self.add_antinodes_for_frequency(antenna_list)
 
     def count_unique_antinodes(self):
-        return len(set(chain.from_iterable(self.frequency_antinodes_map.values())))
+        return self.antinodes_bitmap.count(1)
 
 
 def solve_level1(filename: str):
     lines = read_input_lines(filename)
     antennas_grid = AntennasGrid.from_input_lines(lines)
     antennas_grid.add_antinodes_for_all_frequencies()
-    antennas_grid.filter_antinodes_by_max_dims()
     result = antennas_grid.count_unique_antinodes()
 
     return result
@@ -71,31 +67,41 @@ def solve_level1(filename: str):
 ## Implementation of PART 2
 
 
+def get_multiplier_range(start: int, step: int, size: int) -> Tuple[int, int]:
+    """Range of k (bounds included) for which start + k * step lies in [0, size)."""
+    if step == 0:
+        return (-math.inf, math.inf) if 0 <= start < size else (1, 0)
+    if step > 0:
+        return -(start // step), (size - 1 - start) // step
+    return -((size - 1 - start) // -step), start // -step
+
+
 class HarmonicAntennaGrid(AntennasGrid):
 
-    def get_antinodes_for_antennas_pair(
-        self, antenna1: Tuple[int, int], antenna2: Tuple[int, int]
-    ) -> List[Tuple[int, int]]:
+    def mark_antinodes_for_antennas_pair(self, antenna1: Tuple[int, int], antenna2: Tuple[int, int]):
+        # Every grid position exactly in line with both antennas is an antinode,
+        # so the line is walked with the smallest integer step along it
         antenna_dist_x = antenna2[0] - antenna1[0]
         antenna_dist_y = antenna2[1] - antenna1[1]
-        antinodes = list()
-        for antenna, dist_x, dist_y in (
-            (antenna2, antenna_dist_x, antenna_dist_y),
-            (antenna1, -antenna_dist_x, -antenna_dist_y),
-        ):
-            for multiplier in range(0, 2000):
-                antinode = antenna[0] + dist_x * multiplier, antenna[1] + dist_y * multiplier
-                if antinode[0] < 0 or antinode[0] >= self.max_x or antinode[1] < 0 or antinode[1] >= self.max_y:
-                    break
-                antinodes.append(antinode)
-        return antinodes
+        divisor = math.gcd(antenna_dist_x, antenna_dist_y)
+        step_x, step_y = antenna_dist_x // divisor, antenna_dist_y // divisor
+        if step_y * self.max_x + step_x < 0:
+            step_x, step_y = -step_x, -step_y
+
+        min_k_x, max_k_x = get_multiplier_range(antenna1[0], step_x, self.max_x)
+        min_k_y, max_k_y = get_multiplier_range(antenna1[1], step_y, self.max_y)
+        min_k, max_k = max(min_k_x, min_k_y), min(max_k_x, max_k_y)
+
+        flat_step = step_y * self.max_x + step_x
+        first_idx = (antenna1[1] + min_k * step_y) * self.max_x + antenna1[0] + min_k * step_x
+        last_idx = first_idx + (max_k - min_k) * flat_step
+        self.antinodes_bitmap[first_idx : last_idx + 1 : flat_step] = b"\x01" * (max_k - min_k + 1)
 
 
 def solve_level2(filename: str):
     lines = read_input_lines(filename)
     antennas_grid = HarmonicAntennaGrid.from_input_lines(lines)
     antennas_grid.add_antinodes_for_all_frequencies()
-    antennas_grid.filter_antinodes_by_max_dims()
     result = antennas_grid.count_unique_antinodes()
     return result
 
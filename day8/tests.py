@@ -1,6 +1,6 @@
 import os
 
-from code_logic import solve_level1, solve_level2
+from code_logic import HarmonicAntennaGrid, solve_level1, solve_level2
 
 current_directory = os.path.dirname(__file__)
 
@@ -18,3 +18,8 @@ class TestAdventOfCode:
 
     def test_part2_input(self):
         assert solve_level2(f"{current_directory}/input1.txt") == 1017
+
+    def test_part2_reduced_step(self):
+        antennas_grid = HarmonicAntennaGrid(7, 5, {"a": [(2, 1), (4, 3)]})
+        antennas_grid.add_antinodes_for_all_frequencies()
+        assert antennas_grid.count_unique_antinodes() == 5
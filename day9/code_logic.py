@@ -1,9 +1,5 @@
-import math
+import heapq
 import os.path
-import re
-from collections import deque
-from functools import reduce
-from itertools import chain, zip_longest
 from typing import List, Tuple
 
 import dotenv
@@ -14,97 +10,107 @@ dotenv.load_dotenv()
 
 ## Implementation of PART 1
 
+# Files and free spaces are both run-length segments: (start block, length)
+Segment = Tuple[int, int]
 
-def solve_level1(filename: str):
-    lines = read_input_lines(filename)[0]
-    files_list, spaces_list = split_input_line(lines)
-    moved_files = list()
-
-    for spaces_idx in range(len(spaces_list)):
-
-        relocated_files = list()
 
-        while spaces_list[spaces_idx] > 0:
+def parse_disk_map(line: str) -> Tuple[List[Segment], List[Segment]]:
+    files_segments, spaces_segments = list(), list()
+    position = 0
+    for idx, char in enumerate(line):
+        length = int(char)
+        if idx % 2 == 0:
+            files_segments.append((position, length))
+        else:
+            spaces_segments.append((position, length))
+        position += length
+    return files_segments, spaces_segments
 
-            relocated_files.append(files_list[-1].pop(-1))
-            spaces_list[spaces_idx] -= 1
 
-            if len(files_list[-1]) == 0:
-                files_list.pop(-1)
+def segment_checksum(file_id: int, start: int, length: int) -> int:
+    # file_id * (start + (start + 1) + ... + (start + length - 1))
+    return file_id * (length * start + length * (length - 1) // 2)
 
-        moved_files.append(relocated_files)
 
-        if len(files_list) <= len(moved_files) + 1:
+def compact_blocks_checksum(
+    files_segments: List[Segment], spaces_segments: List[Segment]
+) -> int:
+    checksum = 0
+    last_file_id = len(files_segments) - 1
+    last_file_remaining = files_segments[last_file_id][1]
+
+    for file_id, (file_start, file_length) in enumerate(files_segments):
+        if file_id >= last_file_id:
+            if file_id == last_file_id:
+                checksum += segment_checksum(file_id, file_start, last_file_remaining)
             break
+        checksum += segment_checksum(file_id, file_start, file_length)
 
-    return calculate_checksum(files_list, moved_files)
-
+        # Fill the free space after this file with blocks from the last files
+        space_start, space_length = spaces_segments[file_id]
+        while space_length > 0 and last_file_id > file_id:
+            moved_length = min(space_length, last_file_remaining)
+            checksum += segment_checksum(last_file_id, space_start, moved_length)
+            space_start += moved_length
+            space_length -= moved_length
+            last_file_remaining -= moved_length
+            if last_file_remaining == 0:
+                last_file_id -= 1
+                last_file_remaining = files_segments[last_file_id][1]
 
-def split_input_line(lines):
-    files_list = [
-        [idx] * int(char) if char != "0" else [] for idx, char in enumerate(lines[::2])
-    ]
-    spaces_list = [int(char) for char in lines[1::2]]
-    return files_list, spaces_list
+    return checksum
 
 
-def calculate_checksum(
-    files_list: List[List[int]], moved_files: List[List[int]]
-) -> int:
-    return sum(
-        [
-            int(char) * idx
-            for idx, char in enumerate(
-                chain.from_iterable(
-                    chain.from_iterable(
-                        zip_longest(files_list, moved_files, fillvalue=[])
-                    )
-                )
-            )
-        ]
-    )
+def solve_level1(filename: str):
+    line = read_input_lines(filename)[0]
+    files_segments, spaces_segments = parse_disk_map(line)
+    return compact_blocks_checksum(files_segments, spaces_segments)
 
 
 ## Implementation of PART 2
 
 
-def solve_level2(filename: str):
-
-    lines = read_input_lines(filename)[0]
-
-    files_list, spaces_list = split_input_line(lines)
-
-    moved_files = [list() for _ in range(len(files_list))]
-
-    for file_block_idx in range(len(files_list) - 1, 0, -1):
-
-        file_block_length = len(files_list[file_block_idx])
-
-        alloc_index = search_spaceful_slot_idx(
-            spaces_list, file_block_length, file_block_idx
-        )
-
-        if alloc_index == -1:
+def compact_files_checksum(
+    files_segments: List[Segment], spaces_segments: List[Segment]
+) -> int:
+    # One min-heap of space starts per space length, so the leftmost space
+    # that fits a file is the smallest head among the heaps of large enough spaces
+    max_space_length = max((length for _, length in spaces_segments), default=0)
+    spaces_heaps = [list() for _ in range(max_space_length + 1)]
+    for space_start, space_length in spaces_segments:
+        if space_length > 0:
+            spaces_heaps[space_length].append(space_start)
+    for spaces_heap in spaces_heaps:
+        heapq.heapify(spaces_heap)
+
+    checksum = 0
+    for file_id in range(len(files_segments) - 1, -1, -1):
+        file_start, file_length = files_segments[file_id]
+        best_space_length, best_space_start = None, file_start
+        for space_length in range(file_length, max_space_length + 1):
+            spaces_heap = spaces_heaps[space_length]
+            if spaces_heap and spaces_heap[0] < best_space_start:
+                best_space_length, best_space_start = space_length, spaces_heap[0]
+
+        if best_space_length is None:
+            checksum += segment_checksum(file_id, file_start, file_length)
             continue
 
-        spaces_list[alloc_index] -= file_block_length
-        moved_files[alloc_index].extend(files_list[file_block_idx])
-        files_list[file_block_idx] = [0] * file_block_length
+        heapq.heappop(spaces_heaps[best_space_length])
+        remaining_length = best_space_length - file_length
+        if remaining_length > 0:
+            heapq.heappush(
+                spaces_heaps[remaining_length], best_space_start + file_length
+            )
+        checksum += segment_checksum(file_id, best_space_start, file_length)
 
-    moved_files_with_spaces = [
-        files + [0] * nb_spaces if nb_spaces else files
-        for files, nb_spaces in zip_longest(moved_files, spaces_list)
-    ]
-    return calculate_checksum(files_list, moved_files_with_spaces)
+    return checksum
 
 
-def search_spaceful_slot_idx(
-    spaces_list: List[int], required_space: int, remaining_file_blocks: int
-) -> int:
-    for idx, space in enumerate(spaces_list):
-        if space >= required_space and idx < remaining_file_blocks:
-            return idx
-    return -1
+def solve_level2(filename: str):
+    line = read_input_lines(filename)[0]
+    files_segments, spaces_segments = parse_disk_map(line)
+    return compact_files_checksum(files_segments, spaces_segments)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,11 @@
 import os
-from code_logic import solve_level1, solve_level2
+from code_logic import (
+    compact_blocks_checksum,
+    compact_files_checksum,
+    parse_disk_map,
+    solve_level1,
+    solve_level2,
+)
 
 current_directory = os.path.dirname(__file__)
 
@@ -17,3 +23,8 @@ class TestAdventOfCode:
 
     def test_part2_input(self):
         assert solve_level2(f"{current_directory}/input2.txt") == 6448168620520
+
+    def test_small_disk_maps(self):
+        assert compact_blocks_checksum(*parse_disk_map("12345")) == 60
+        assert compact_files_checksum(*parse_disk_map("12345")) == 132
+        assert compact_blocks_checksum(*parse_disk_map("202")) == 5
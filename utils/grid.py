@@ -0,0 +1,180 @@
+import mmap
+import os
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+NEIGHBOUR_OFFSETS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+DIAGONAL_OFFSETS = [(1, -1), (1, 1), (-1, 1), (-1, -1)]
+
+
+class Grid:
+    """Rectangular character grid stored in a single contiguous buffer.
+
+    Rows start every `stride` bytes, which lets a grid read from disk keep the
+    layout of the input file, line separators included. Cells
+    are addressed with (x, y) coordinates, x being the column and y the row,
+    and are returned as integer byte values (use `chr` or compare with `ord`).
+    """
+
+    def __init__(
+        self,
+        buffer: Union[bytearray, bytes, mmap.mmap],
+        width: int,
+        height: int,
+        stride: Optional[int] = None,
+    ):
+        self.buffer = buffer
+        self.width = width
+        self.height = height
+        self.stride = stride if stride is not None else width
+        if self.stride < width or len(buffer) < self.stride * (height - 1) + width:
+            raise ValueError("Buffer too small for the requested grid dimensions")
+        self.view = memoryview(buffer)
+
+    @classmethod
+    def from_lines(cls, lines: List[str]):
+        width = len(lines[0]) if lines else 0
+        if any(len(line) != width for line in lines):
+            raise ValueError("All grid lines should have the same length")
+        buffer = bytearray("".join(lines), "ascii")
+        return cls(buffer, width, len(lines))
+
+    @classmethod
+    def from_file(cls, filename: str, writable: bool = False):
+        """Map the grid straight from the input file, without copying it.
+
+        The grid ends at the first empty line (or at the end of the file), so
+        files holding a grid followed by other sections can be mapped as well.
+        With `writable`, cell writes go to a private copy-on-write mapping and
+        never reach the file. Use the grid as a context manager, or call
+        `close`, to release the mapping.
+        """
+        with open(filename, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Empty files cannot be mapped
+                return cls(bytearray(), 0, 0)
+            access = mmap.ACCESS_COPY if writable else mmap.ACCESS_READ
+            buffer = mmap.mmap(f.fileno(), 0, access=access)
+        width = buffer.find(b"\n")
+        if width == -1:
+            return cls(buffer, len(buffer), 1)
+        stride = width + 1
+        if width > 0 and buffer[width - 1] == ord("\r"):
+            width -= 1
+        grid_end = buffer.find(b"\n\n")
+        if grid_end == -1:
+            grid_end = buffer.find(b"\n\r\n")
+        grid_end = len(buffer) if grid_end == -1 else grid_end + 1
+        height = (grid_end + stride - width) // stride
+        return cls(buffer, width, height, stride)
+
+    def close(self):
+        """Release the buffer view, and the mapping of a grid read from a file.
+
+        Arrays returned by `to_array` keep the buffer exported, so they have to
+        be released first.
+        """
+        self.view.release()
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def index(self, x: int, y: int) -> int:
+        return y * self.stride + x
+
+    def coords(self, index: int) -> Tuple[int, int]:
+        y, x = divmod(index, self.stride)
+        return x, y
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def __getitem__(self, coords: Tuple[int, int]) -> int:
+        x, y = coords
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"Coordinates {coords} out of the grid")
+        return self.buffer[y * self.stride + x]
+
+    def __setitem__(self, coords: Tuple[int, int], value: int):
+        x, y = coords
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"Coordinates {coords} out of the grid")
+        self.buffer[y * self.stride + x] = value
+
+    def get(self, x: int, y: int, default: Optional[int] = None) -> Optional[int]:
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.buffer[y * self.stride + x]
+        return default
+
+    def neighbours(
+        self, x: int, y: int, diagonals: bool = False
+    ) -> Iterator[Tuple[int, int]]:
+        offsets = NEIGHBOUR_OFFSETS
+        if diagonals:
+            offsets = NEIGHBOUR_OFFSETS + DIAGONAL_OFFSETS
+        for dx, dy in offsets:
+            new_x, new_y = x + dx, y + dy
+            if 0 <= new_x < self.width and 0 <= new_y < self.height:
+                yield new_x, new_y
+
+    def row(self, y: int) -> memoryview:
+        if not 0 <= y < self.height:
+            raise IndexError(f"Row {y} out of the grid")
+        start = y * self.stride
+        return self.view[start : start + self.width]
+
+    def column(self, x: int) -> memoryview:
+        if not 0 <= x < self.width:
+            raise IndexError(f"Column {x} out of the grid")
+        return self.view[x : self.index(x, self.height - 1) + 1 : self.stride]
+
+    def diagonal(self, x: int, y: int, anti: bool = False) -> memoryview:
+        """View of the diagonal going through (x, y), from its top end.
+
+        The standard diagonal goes down-right, the anti diagonal goes down-left.
+        """
+        if not self.in_bounds(x, y):
+            raise IndexError(f"Coordinates {(x, y)} out of the grid")
+        if anti:
+            back_steps = min(self.width - 1 - x, y)
+            start_x, start_y = x + back_steps, y - back_steps
+            length = min(start_x + 1, self.height - start_y)
+            step = self.stride - 1
+        else:
+            back_steps = min(x, y)
+            start_x, start_y = x - back_steps, y - back_steps
+            length = min(self.width - start_x, self.height - start_y)
+            step = self.stride + 1
+        start = self.index(start_x, start_y)
+        return self.view[start : start + (length - 1) * step + 1 : step]
+
+    def find_all(self, character: str) -> Iterator[Tuple[int, int]]:
+        target = character.encode("ascii")
+        for y in range(self.height):
+            start = y * self.stride
+            end = start + self.width
+            idx = self.buffer.find(target, start, end)
+            while idx != -1:
+                yield idx - start, y
+                idx = self.buffer.find(target, idx + 1, end)
+
+    def find(self, character: str) -> Optional[Tuple[int, int]]:
+        return next(self.find_all(character), None)
+
+    def to_array(self) -> np.ndarray:
+        """NumPy (height, width) uint8 view over the same buffer."""
+        return np.ndarray(
+            (self.height, self.width),
+            dtype=np.uint8,
+            buffer=self.buffer,
+            strides=(self.stride, 1),
+        )
+
+    def lines(self) -> List[str]:
+        return [self.row(y).tobytes().decode("ascii") for y in range(self.height)]
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from grid import Grid
+from utils import (
+    iter_input_sections,
+    iter_mapped_lines,
+    iter_mapped_records,
+    iter_mapped_sections,
+    read_input_lines,
+)
+
+current_directory = os.path.dirname(__file__)
+root_directory = os.path.dirname(current_directory)
+
+
+class TestGrid:
+
+    lines = ["ABC", "DEF", "GHI", "JKL"]
+
+    def test_from_lines_views(self):
+        grid = Grid.from_lines(self.lines)
+        assert (grid.width, grid.height) == (3, 4)
+        assert chr(grid[2, 1]) == "F"
+        assert grid.row(3).tobytes() == b"JKL"
+        assert grid.column(1).tobytes() == b"BEHK"
+        assert grid.diagonal(1, 2).tobytes() == b"DHL"
+        assert grid.diagonal(1, 1, anti=True).tobytes() == b"CEG"
+
+    def test_bounds_checks(self):
+        grid = Grid.from_lines(self.lines)
+        assert grid.get(3, 0) is None
+        assert grid.get(-1, 0, default=0) == 0
+        assert sorted(grid.neighbours(0, 0)) == [(0, 1), (1, 0)]
+        assert len(list(grid.neighbours(1, 1, diagonals=True))) == 8
+        with pytest.raises(IndexError):
+            grid[0, 4]
+
+    def test_from_file_matches_lines(self):
+        filename = f"{root_directory}/day15/sample1.txt"
+        grid = Grid.from_file(filename)
+        with open(filename) as f:
+            expected_lines = f.read().split("\n\n")[0].split("\n")
+        assert grid.lines() == expected_lines
+        assert grid.find("@") == (4, 4)
+        assert grid.to_array().shape == (grid.height, grid.width)
+        grid.close()
+        assert grid.buffer.closed
+
+    def test_from_empty_file(self, tmp_path):
+        filename = tmp_path / "empty.txt"
+        filename.write_text("")
+        with Grid.from_file(str(filename)) as grid:
+            assert (grid.width, grid.height) == (0, 0)
+            assert grid.lines() == []
+
+
+class TestInputReaders:
+
+    filename = f"{root_directory}/day17/sample1.txt"
+
+    def test_mapped_lines_match_text_lines(self):
+        assert [
+            line.decode() for line in iter_mapped_lines(self.filename)
+        ] == read_input_lines(self.filename)
+
+    def test_sections(self):
+        assert list(iter_input_sections(self.filename)) == [
+            ["Register A: 729", "Register B: 0", "Register C: 0"],
+            ["Program: 0,1,5,4,3,0"],
+        ]
+        assert [len(section) for section in iter_mapped_sections(self.filename)] == [
+            3,
+            1,
+        ]
+
+    def test_fixed_width_records(self):
+        records = list(iter_mapped_records(f"{root_directory}/day10/sample1.txt", 8))
+        assert len(records) == 8
+        assert records[0] == b"89010123"
+
+    def test_crlf_lines(self, tmp_path):
+        filename = tmp_path / "crlf.txt"
+        filename.write_bytes(b"a\r\nb\r\n\r\nc\r\n")
+        assert list(iter_mapped_sections(str(filename))) == [[b"a", b"b"], [b"c"]]
+        assert list(iter_input_sections(str(filename))) == [["a", "b"], ["c"]]
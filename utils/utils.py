@@ -1,5 +1,8 @@
+import mmap
 import os
 import re
+from contextlib import contextmanager
+from typing import Iterator, List
 from bs4 import BeautifulSoup as Soup
 from urllib import request
 import requests
@@ -31,9 +34,78 @@ def get_input_if_not_exists(year: int, dirname: str, level: int):
 def read_input_lines(filename: str):
     if not (os.path.exists(filename)):
         print("Input file not found when trying to read input lines!")
+    return list(iter_input_lines(filename))
+
+
+def iter_input_lines(filename: str) -> Iterator[str]:
     with open(filename, "r") as f:
-        lines = [line.replace("\n", "") for line in f.readlines()]
-    return lines
+        for line in f:
+            yield line.rstrip("\n")
+
+
+def iter_input_sections(filename: str) -> Iterator[List[str]]:
+    """Yield the blocks of lines separated by empty lines, one block at a time."""
+    section = list()
+    for line in iter_input_lines(filename):
+        if len(line) == 0:
+            yield section
+            section = list()
+            continue
+        section.append(line)
+    if section:
+        yield section
+
+
+@contextmanager
+def map_input_file(filename: str) -> Iterator[mmap.mmap]:
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            yield mapped_file
+
+
+def iter_mapped_lines(filename: str) -> Iterator[bytes]:
+    """Yield the lines of the file as bytes, without their "\n" or "\r\n".
+
+    The file is memory-mapped, so only the line being yielded is copied.
+    """
+    with map_input_file(filename) as mapped_file:
+        start = 0
+        end_of_file = len(mapped_file)
+        while start < end_of_file:
+            end = mapped_file.find(b"\n", start)
+            if end == -1:
+                end = end_of_file
+            line_end = end
+            if line_end > start and mapped_file[line_end - 1] == ord("\r"):
+                line_end -= 1
+            yield mapped_file[start:line_end]
+            start = end + 1
+
+
+def iter_mapped_records(
+    filename: str, record_length: int, separator_length: int = 1
+) -> Iterator[bytes]:
+    """Yield fixed-width records, skipping `separator_length` bytes after each."""
+    with map_input_file(filename) as mapped_file:
+        step = record_length + separator_length
+        for start in range(0, len(mapped_file) - record_length + 1, step):
+            yield mapped_file[start : start + record_length]
+
+
+def iter_mapped_sections(filename: str) -> Iterator[List[bytes]]:
+    section = list()
+    for line in iter_mapped_lines(filename):
+        if len(line) == 0:
+            yield section
+            section = list()
+            continue
+        section.append(line)
+    if section:
+        yield section
 
 
 def get_current_day(dirname: str):